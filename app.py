@@ -0,0 +1,162 @@
+"""
+LISTA DE COMPRAS - ARQUITETURA MVC CORRIGIDA
+TechList Solutions - KivyMD 1.2.0
+"""
+import time
+_T_INICIO = time.perf_counter()  # ⏱️ antes de qualquer import pesado
+
+import json
+import os
+
+try:
+    from kivy.utils import platform
+except:
+    pass
+
+from kivy.clock import Clock
+from kivy.uix.screenmanager import ScreenManager
+from kivymd.app import MDApp
+
+from models.database import Database, db
+from models.async_database import adb
+from controllers.export_jobs import export_queue
+from views.home_view import HomeView
+from controllers.home_controller import HomeController
+from controllers.lista_controller import ListaController
+from utils.log import get_logger
+# ListaView, openpyxl, reportlab e plyer só são importados quando usados
+
+_T_IMPORTS = time.perf_counter()
+
+log = get_logger('app')
+
+# COMPRAS_TRACE: "1" (só coleta), "overlay" e/ou caminho .json, separados por vírgula
+TRACE_ENV = 'COMPRAS_TRACE'
+# COMPRAS_SYNC: URL do servidor de sincronização (python -m controllers.sync_transport)
+SYNC_ENV = 'COMPRAS_SYNC'
+# on_pause espera as marcações chegarem ao banco (Android pode matar o processo depois)
+PAUSA_FLUSH_S = 2.0
+
+
+class MVCApp(MDApp):
+    def build(self):
+        t_build = time.perf_counter()
+        self.theme_cls.theme_style = "Light"
+        
+        # ✅ RESULTADOS DO BANCO VOLTAM PARA A THREAD DO KIVY
+        adb.dispatcher = lambda func: Clock.schedule_once(lambda dt: func())
+        export_queue.dispatcher = adb.dispatcher
+        
+        sm = ScreenManager()
+        
+        # ✅ 1. CRIAR VIEWS PRIMEIRO (ListaView só na primeira navegação)
+        home_view = HomeView(lambda action, *args: self.home_controller.handle_event(action, *args))
+        
+        def criar_lista_view():
+            from views.lista_view import ListaView
+            lista_view = ListaView(lambda action, *args: self.lista_controller.handle_event(action, *args))
+            lista_view.sm = sm
+            sm.add_widget(lista_view)
+            return lista_view
+        
+        # ✅ 2. INJETAR ScreenManager
+        home_view.sm = sm
+        
+        # ✅ 3. CRIAR CONTROLLERS COM VIEWS PRONTAS
+        self.lista_controller = ListaController(criar_lista_view, home_view)
+        self.home_controller = HomeController(home_view, self.lista_controller)
+        
+        sm.add_widget(home_view)
+        sm.current = 'home'
+        self._instalar_tracing()
+        self._tempos = {
+            'imports_ms': (_T_IMPORTS - _T_INICIO) * 1000,
+            'build_ms': (time.perf_counter() - t_build) * 1000,
+        }
+        return sm
+        
+        def _create_controller_callback(self, action: str, *args):
+            """Callback genérico para views chamarem controllers"""
+            # Este método será chamado pelas views
+            pass  # Controllers já injetados nas views
+    
+    def _instalar_tracing(self):
+        """Instrumentação de latência, só se pedida (sem ela, custo zero)"""
+        self.tracer = None
+        self._trace_arquivo = None
+        opcoes = [o.strip() for o in os.environ.get(TRACE_ENV, '').split(',') if o.strip()]
+        if not opcoes:
+            return
+        from utils import tracing
+        self.tracer = tracing.install([self.home_controller, self.lista_controller], Database, adb)
+        self.tracer.proximo_frame = lambda func: Clock.schedule_once(lambda dt: func())
+        for opcao in opcoes:
+            if opcao == 'overlay':
+                from kivy.core.window import Window
+                from views.debug_overlay import DebugOverlay
+                Window.add_widget(DebugOverlay(self.tracer))
+            elif opcao.endswith('.json'):
+                self._trace_arquivo = opcao
+    
+    def on_start(self):
+        # Próximo tick do Clock = primeiro frame já desenhado
+        Clock.schedule_once(self._primeiro_frame)
+    
+    def _primeiro_frame(self, dt):
+        """Relatório de startup; só então abre o banco e carrega as listas"""
+        self._tempos['primeiro_frame_ms'] = (time.perf_counter() - _T_INICIO) * 1000
+        log.info("⏱️ Startup: imports %.0f ms | build %.0f ms | primeiro frame %.0f ms",
+                 self._tempos['imports_ms'], self._tempos['build_ms'],
+                 self._tempos['primeiro_frame_ms'])
+        caminho = os.environ.get('STARTUP_REPORT')
+        if caminho:
+            with open(caminho, 'w') as f:
+                json.dump(self._tempos, f, indent=2)
+        self.home_controller.refresh_listas()
+        self._sincronizar()
+    
+    def _sincronizar(self):
+        """Sincronização delta em segundo plano, só se COMPRAS_SYNC estiver definido"""
+        url = os.environ.get(SYNC_ENV)
+        if not url:
+            return
+        import threading
+        from controllers.sync import SyncEngine
+        from controllers.sync_transport import HttpTransport
+        
+        def executar():
+            try:
+                stats = SyncEngine(db.get(), HttpTransport(url)).sync()
+            except Exception as e:
+                log.warning("⚠️ Sincronização falhou: %s", e)
+                return
+            if stats['aplicadas']:
+                Clock.schedule_once(lambda dt: self.home_controller.refresh_listas())
+        
+        threading.Thread(target=executar, name='sync', daemon=True).start()
+    
+    def on_pause(self):
+        """App em segundo plano (Android pode encerrá-lo): grava as marcações pendentes"""
+        self.lista_controller.flush(esperar=PAUSA_FLUSH_S)
+        self._sincronizar()
+        return True
+    
+    def on_stop(self):
+        """Encerra exportações, threads e conexões do banco (espera escritas pendentes)"""
+        export_queue.shutdown()
+        self.lista_controller.flush()
+        adb.shutdown(wait=True)
+        if db.is_open:
+            log.info("🧠 Cache de leituras: %s", db.cache_stats())
+        db.close()
+        if self.tracer:
+            for acao, metricas in sorted(self.tracer.summary().items()):
+                total = metricas['total_ms']
+                log.info("⏱️ %s (n=%d): p50 %.1f | p95 %.1f | p99 %.1f ms", acao, metricas['n'],
+                         total['p50'], total['p95'], total['p99'])
+            if self._trace_arquivo:
+                self.tracer.dump(self._trace_arquivo)
+
+
+if __name__ == '__main__':
+    MVCApp().run()
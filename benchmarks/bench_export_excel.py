@@ -0,0 +1,82 @@
+"""
+BENCHMARK - Exportação Excel: implementação antiga x streaming
+Uso: python -m benchmarks.bench_export_excel [--listas 300] [--itens 200]
+
+Cada variante roda em um processo novo para medir o pico de RSS isolado.
+"antiga" reproduz o _create_excel original (N+1 consultas, Workbook normal,
+valores em texto "R$..."); "streaming" é controllers.export.create_excel.
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from datetime import datetime
+from typing import List, Tuple
+
+from benchmarks.datagen import popular
+from models.database import Database
+
+
+def _excel_antigo(database: Database, pasta: str, lista_ids: List[int]) -> str:
+    """Cópia fiel da versão anterior (referência)"""
+    from openpyxl import Workbook
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Lista", "Item", "Qtd", "Preço", "Comprado", "Subtotal"])
+
+    total = 0
+    for lista_id in lista_ids:
+        nome_lista = database.get_lista_nome(lista_id)
+        for item in database.get_itens(lista_id):
+            _, nome, qtd, preco, comprado = item[:5]
+            subtotal = qtd * preco if comprado else 0
+            if comprado: total += subtotal
+            ws.append([nome_lista, nome, qtd, f"R${preco:.2f}",
+                      "Sim" if comprado else "Não", f"R${subtotal:.2f}"])
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = os.path.join(pasta, f"lista_compras_antigo_{timestamp}.xlsx")
+    wb.save(filename)
+    return filename
+
+
+def _executar(variante: str, caminho: str, lista_ids: List[int], pasta: str) -> Tuple[float, int, int]:
+    """Roda no processo filho: (segundos, RSS inicial KB, pico RSS KB)"""
+    from controllers import export
+    import openpyxl  # noqa: F401 - import fora da medição
+
+    database = Database(caminho)
+    func = _excel_antigo if variante == 'antiga' else export.create_excel
+    rss_inicial = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    func(database, pasta, lista_ids)
+    duracao = time.perf_counter() - inicio
+    return duracao, rss_inicial, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--listas', type=int, default=300)
+    parser.add_argument('--itens', type=int, default=200, help="itens por lista")
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'compras.db')
+        database = Database(caminho)
+        ids = popular(database, args.listas, args.itens, args.itens)
+        database.close()
+        print(f"📦 {args.listas} listas, {args.listas * args.itens} itens")
+
+        print(f"{'variante':<12}{'tempo (s)':>11}{'pico RSS (MB)':>15}{'acréscimo (MB)':>16}")
+        for variante in ('antiga', 'streaming'):
+            with ctx.Pool(1) as pool:
+                duracao, rss_inicial, rss_pico = pool.apply(_executar, (variante, caminho, ids, pasta))
+            print(f"{variante:<12}{duracao:>11.2f}{rss_pico / 1024:>15.1f}"
+                  f"{(rss_pico - rss_inicial) / 1024:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+BENCHMARK - Latência das consultas antes/depois das migrações
+Uso: python -m benchmarks.bench_migrations [--listas 200] [--itens 100] [--ate 2]
+
+Cria um compras.db no formato antigo (schema v1, sem índices), mede
+get_itens / get_total_comprados / delete_lista, aplica as migrações até
+--ate (padrão v2, a dos índices) e mede de novo; depois vai até a última
+versão e mede uma terceira vez.
+
+A coluna da última versão NÃO é só ganho: triggers das migrações seguintes
+(totais v3/v5, FTS v4, cascata v6, changelog de sincronização v7) rodam
+dentro de delete_lista, que fica mais lenta que no v1. O relatório marca
+essas regressões em vez de escondê-las na média.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.datagen import popular
+from models import migrations
+from models.database import Database
+
+# Migrações cujos triggers pesam em cada escrita de itens (ver docstring)
+CUSTO_ESCRITA = "triggers de totais (v3/v5), FTS (v4), cascata (v6) e changelog (v7)"
+
+
+def _medir(func: Callable, args_list: List[tuple]) -> float:
+    """Mediana em milissegundos"""
+    tempos = []
+    for args in args_list:
+        inicio = time.perf_counter()
+        func(*args)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def _total_legado(database: Database, lista_id: int) -> float:
+    """get_total_comprados original (SUM sobre itens), para schemas sem lista_totais"""
+    cursor = database._reader().cursor()
+    cursor.execute(
+        "SELECT SUM(quantidade * preco_unit) FROM itens WHERE lista_id=? AND comprado=1",
+        (lista_id,)
+    )
+    return cursor.fetchone()[0] or 0.0
+
+
+def _rodada(database: Database, ids: List[int], amostras: int) -> Dict[str, float]:
+    alvo = [(random.choice(ids),) for _ in range(amostras)]
+    if database.schema_version >= 3:
+        total = database.get_total_comprados
+    else:
+        total = lambda lista_id: _total_legado(database, lista_id)
+    resultado = {
+        'get_itens': _medir(database.get_itens, alvo),
+        'get_total_comprados': _medir(total, alvo),
+    }
+    # delete_lista é destrutivo: consome listas distintas
+    removidas = [(ids.pop(),) for _ in range(min(amostras, len(ids) // 2))]
+    resultado['delete_lista'] = _medir(database.delete_lista, removidas)
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--listas', type=int, default=200)
+    parser.add_argument('--itens', type=int, default=100, help="itens por lista")
+    parser.add_argument('--amostras', type=int, default=30)
+    parser.add_argument('--ate', type=int, default=2, help="versão comparada com o v1 (padrão: 2)")
+    args = parser.parse_args()
+    ultima = migrations.LATEST_VERSION
+    random.seed(42)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'compras.db')
+        database = Database(caminho, auto_migrate=False)
+        database.migrate(target=1)
+        ids = popular(database, args.listas, args.itens, args.itens)
+        total_itens = args.listas * args.itens
+        print(f"📦 {args.listas} listas, {total_itens} itens (schema v{database.schema_version})")
+
+        rodadas = {1: _rodada(database, ids, args.amostras)}
+        for alvo in sorted({min(max(args.ate, 2), ultima), ultima}):
+            inicio = time.perf_counter()
+            versao = database.migrate(target=alvo)
+            duracao = (time.perf_counter() - inicio) * 1000
+            print(f"🔧 Migração para v{versao} em {duracao:.1f} ms")
+            rodadas[versao] = _rodada(database, ids, args.amostras)
+        database.close()
+
+    antes = rodadas[1]
+    versoes = sorted(rodadas)[1:]
+    print(f"{'consulta':<22}{'v1 (ms)':>10}" + "".join(f"{f'v{v} (ms)':>11}{'ganho':>8}" for v in versoes))
+    regressoes = []
+    for nome in antes:
+        linha = f"{nome:<22}{antes[nome]:>10.3f}"
+        for versao in versoes:
+            depois = rodadas[versao][nome]
+            ganho = antes[nome] / depois if depois else float('inf')
+            linha += f"{depois:>11.3f}{ganho:>7.1f}x"
+            if ganho < 1:
+                regressoes.append((nome, versao, ganho))
+        print(linha)
+    for nome, versao, ganho in regressoes:
+        causa = f" ({CUSTO_ESCRITA})" if versao > 2 else ""
+        print(f"⚠️ {nome} no v{versao}: {1 / ganho:.1f}x mais lenta que no v1{causa}")
+
+
+if __name__ == '__main__':
+    main()
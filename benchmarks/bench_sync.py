@@ -0,0 +1,93 @@
+"""
+BENCHMARK - Sincronização delta: custo x tamanho do banco
+Uso: python -m benchmarks.bench_sync [--tamanhos 100 1000 5000] [--mudancas 50] [--lote 20000]
+
+Para cada tamanho (nº de listas, 20 itens cada): sincroniza dois aparelhos
+pelo SyncServer em processo, faz `mudancas` marcações no aparelho A e mede
+o envio (A) e o recebimento (B) dessa rodada. Tempo e bytes devem ficar
+estáveis com o banco crescendo.
+
+Depois mede o preço pago nas escritas: create_itens de `lote` itens e
+delete_lista deles, com e sem os triggers do changelog (um registro por
+linha alterada, ver migrations._v7_sync_changelog).
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.datagen import popular
+from controllers.sync import SyncEngine
+from controllers.sync_transport import LocalTransport, SyncServer
+from models.database import Database
+
+TRIGGERS_SYNC = ('trg_itens_sync_ins', 'trg_itens_sync_upd', 'trg_itens_sync_del')
+
+
+def _rodada(tamanho: int, mudancas: int, pasta: str) -> tuple:
+    servidor = SyncServer()
+    a = Database(os.path.join(pasta, f'a_{tamanho}.db'))
+    b = Database(os.path.join(pasta, f'b_{tamanho}.db'))
+    popular(a, tamanho, 20, 20)
+    transporte = LocalTransport(servidor)
+    motor_a, motor_b = SyncEngine(a, transporte), SyncEngine(b, LocalTransport(servidor))
+    motor_a.sync()
+    motor_b.sync()  # carga inicial: proporcional ao banco (fora da medição)
+
+    rng = random.Random(tamanho)
+    item_ids = [row[0] for row in a._reader().execute("SELECT id FROM itens")]
+    a.toggle_itens((item_id, rng.random() < 0.5) for item_id in rng.sample(item_ids, mudancas))
+    enviados = transporte.bytes_enviados
+    inicio = time.perf_counter()
+    motor_a.sync()
+    envio = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    motor_b.sync()
+    recebimento = time.perf_counter() - inicio
+    a.close()
+    b.close()
+    return envio * 1000, recebimento * 1000, transporte.bytes_enviados - enviados
+
+
+def _escrita(lote: int, pasta: str, com_sync: bool) -> tuple:
+    """(create_itens, delete_lista) em ms num banco novo"""
+    database = Database(os.path.join(pasta, f'escrita_{int(com_sync)}.db'))
+    if not com_sync:
+        with database._write() as conn:
+            for trigger in TRIGGERS_SYNC:
+                conn.execute(f"DROP TRIGGER {trigger}")
+    lista_id = database.create_lista("lote")
+    itens = [(f"item {i}", 1, 2.5) for i in range(lote)]
+    inicio = time.perf_counter()
+    database.create_itens(lista_id, itens)
+    criacao = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    database.delete_lista(lista_id)
+    exclusao = time.perf_counter() - inicio
+    database.close()
+    return criacao * 1000, exclusao * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[100, 1000, 5000], help="nº de listas")
+    parser.add_argument('--mudancas', type=int, default=50)
+    parser.add_argument('--lote', type=int, default=20000, help="itens da medição de escrita")
+    args = parser.parse_args()
+
+    print(f"{'listas':>8}{'itens':>9}{'envio (ms)':>12}{'receb. (ms)':>13}{'bytes':>8}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for tamanho in args.tamanhos:
+            envio, recebimento, enviados = _rodada(tamanho, args.mudancas, pasta)
+            print(f"{tamanho:>8}{tamanho * 20:>9}{envio:>12.1f}{recebimento:>13.1f}{enviados:>8}")
+
+        print(f"\n✍️ Escritas em lote ({args.lote} itens)")
+        print(f"{'changelog':<12}{'create_itens (ms)':>19}{'delete_lista (ms)':>19}")
+        for com_sync in (False, True):
+            criacao, exclusao = _escrita(args.lote, pasta, com_sync)
+            print(f"{'com' if com_sync else 'sem':<12}{criacao:>19.1f}{exclusao:>19.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+BENCHMARK - Gerador de dados sintéticos
+Popula um Database com listas e itens realistas (nomes com acento,
+quantidades e preços variados), em uma transação e em streaming.
+"""
+import random
+from typing import Dict, Iterator, List, Tuple
+
+from models.database import Database
+
+# Escalas pré-definidas: (listas, itens mín., itens máx. por lista)
+ESCALAS: Dict[str, Tuple[int, int, int]] = {
+    'pequena': (10, 5, 50),
+    'media': (1_000, 5, 50),
+    'grande': (100_000, 1, 20),
+}
+
+PRODUTOS = [
+    "Arroz 5kg", "Feijão preto", "Feijão carioca", "Açúcar refinado", "Café torrado",
+    "Leite integral", "Pão francês", "Manteiga", "Queijo minas", "Presunto",
+    "Óleo de soja", "Macarrão espaguete", "Molho de tomate", "Farinha de trigo",
+    "Sabão em pó", "Detergente", "Papel higiênico", "Banana prata", "Maçã fuji",
+    "Tomate", "Cebola", "Batata", "Alho", "Frango congelado", "Carne moída",
+    "Ovos (dúzia)", "Iogurte natural", "Suco de laranja", "Água mineral", "Biscoito",
+]
+
+
+def _itens(ids: List[int], contagens: Dict[int, int], rng: random.Random,
+           intercalar: bool) -> Iterator[tuple]:
+    """Linhas (lista_id, nome, qtd, preço, comprado) sem montar tudo em memória"""
+    def linha(lista_id: int, n: int) -> tuple:
+        return (lista_id, f"{rng.choice(PRODUTOS)} {n}", rng.randint(1, 6),
+                round(rng.uniform(0.5, 80), 2), int(rng.random() < 0.4))
+
+    if intercalar:
+        # Intercaladas como num histórico real (itens de uma lista espalhados)
+        for n in range(max(contagens.values(), default=0)):
+            for lista_id in ids:
+                if contagens[lista_id] > n:
+                    yield linha(lista_id, n)
+    else:
+        for lista_id in ids:
+            for n in range(contagens[lista_id]):
+                yield linha(lista_id, n)
+
+
+def popular(database: Database, num_listas: int, itens_min: int = 5, itens_max: int = 50,
+            seed: int = 42, intercalar: bool = True) -> List[int]:
+    """Insere num_listas listas com itens_min..itens_max itens cada; retorna IDs"""
+    rng = random.Random(seed)
+    with database._write() as conn:
+        conn.executemany("INSERT INTO listas (nome) VALUES (?)",
+                         ((f"Lista {i} - {rng.choice(PRODUTOS)}",) for i in range(num_listas)))
+        ids = [row[0] for row in conn.execute("SELECT id FROM listas ORDER BY id")]
+        contagens = {lista_id: rng.randint(itens_min, itens_max) for lista_id in ids}
+        conn.executemany(
+            "INSERT INTO itens (lista_id, nome, quantidade, preco_unit, comprado) "
+            "VALUES (?, ?, ?, ?, ?)", _itens(ids, contagens, rng, intercalar)
+        )
+    database.invalidate_cache()
+    return ids
@@ -0,0 +1,214 @@
+"""
+BENCHMARK - Suíte headless (sem Kivy) de Database e exportadores
+Uso:
+    python -m benchmarks.suite --escala media --saida base.json
+    python -m benchmarks.suite --escala media --saida atual.json --comparar base.json --limite 1.25
+
+Gera (ou reaproveita, com --banco) um banco sintético, mede cada método
+e grava JSON com mediana/p95 em ms. Com --comparar, sai com código 1 se
+algum método ficar mais lento que limite x a referência.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from benchmarks.datagen import ESCALAS, PRODUTOS, popular
+from models.database import Database
+
+RUIDO_MS = 0.05  # diferenças absolutas abaixo disso não contam como regressão
+
+Caso = Union[Callable[[], object], Tuple[Callable[[], object], Callable[[object], object]]]
+
+
+def _medir(caso: Caso, repeticoes: int) -> Dict[str, float]:
+    """Caso = chamada, ou (preparar, chamada): preparar() roda fora do tempo
+    medido e o retorno dele vai para chamada(...)"""
+    preparar, func = caso if isinstance(caso, tuple) else (None, caso)
+    tempos = []
+    for _ in range(repeticoes):
+        args = (preparar(),) if preparar else ()
+        inicio = time.perf_counter()
+        func(*args)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        'mediana_ms': statistics.median(tempos),
+        'p95_ms': tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))],
+        'n': len(tempos),
+    }
+
+
+def _lista_tmp(database: Database) -> int:
+    """Lista descartável com 20 itens (para os casos de exclusão)"""
+    lista_id = database.create_lista("tmp")
+    database.create_itens(lista_id, [("tmp", 1, 1.0)] * 20)
+    return lista_id
+
+
+def _casos(database: Database, ids: List[int], rng: random.Random, pasta: str) -> Dict[str, Caso]:
+    """Método -> chamada; leituras primeiro, escritas e exclusões por último"""
+    from controllers import export
+    from controllers.autocomplete import ItemAutocomplete
+
+    item_ids = [row[0] for row in database.get_itens(rng.choice(ids))] or [1]
+    alvo = lambda: rng.choice(ids)
+    termo = lambda: rng.choice(PRODUTOS).split()[0][:4]
+    export_ids = ids[:min(len(ids), 50)]
+    sugestoes = ItemAutocomplete()
+    sugestoes.carregar(database.iter_historico_itens())
+
+    casos = {
+        'get_listas': lambda: database.get_listas(),
+        'get_listas_page': lambda: database.get_listas_page(rng.choice(ids), 100),
+        'search_listas': lambda: database.search_listas(termo()),
+        'get_lista_nome': lambda: database.get_lista_nome(alvo()),
+        'get_item': lambda: database.get_item(rng.choice(item_ids)),
+        'get_itens': lambda: database.get_itens(alvo()),
+        'get_itens_page': lambda: database.get_itens_page(alvo(), 0, 100),
+        'search_itens': lambda: database.search_itens(alvo(), termo()),
+        'get_total_comprados': lambda: database.get_total_comprados(alvo()),
+        'get_totais': lambda: database.get_totais(alvo()),
+        'get_listas_stats': lambda: database.get_listas_stats(tuple(ids[:100])),
+        'iter_export_rows': lambda: sum(1 for _ in database.iter_export_rows(export_ids)),
+        'iter_historico_itens': lambda: sum(1 for _ in database.iter_historico_itens()),
+        'autocomplete': lambda: sugestoes.sugerir(termo()[:rng.randint(1, 4)]),
+        'verify_totais': lambda: database.verify_totais(),
+        'create_lista': lambda: database.create_lista("Bench"),
+        'create_item': lambda: database.create_item(alvo(), "Bench item", 1, 2.5),
+        'create_itens': lambda: database.create_itens(alvo(), [("Bench lote", 1, 1.0)] * 100),
+        'toggle_item': lambda: database.toggle_item(rng.choice(item_ids), rng.random() < 0.5),
+        'toggle_itens': lambda: database.toggle_itens((i, rng.random() < 0.5) for i in item_ids[:20]),
+        # Exclusões: o que é apagado é criado em preparar, fora do tempo medido
+        'delete_item': (lambda: database.create_item(alvo(), "tmp", 1, 1), database.delete_item),
+        'delete_lista': (lambda: _lista_tmp(database), database.delete_lista),
+        'delete_listas': (lambda: [_lista_tmp(database) for _ in range(10)], database.delete_listas),
+        'rebuild_totais': lambda: database.rebuild_totais(),
+    }
+    # Exportadores só se a dependência opcional estiver instalada
+    for nome, modulo, func in (('create_excel', 'openpyxl', export.create_excel),
+                               ('create_pdf', 'reportlab', export.create_pdf)):
+        try:
+            __import__(modulo)
+        except ImportError:
+            continue
+        casos[nome] = lambda func=func: os.remove(func(database, pasta, export_ids))
+    casos['create_csv'] = lambda: os.remove(export.create_csv(database, pasta, export_ids))
+    casos['create_jsonl_gz'] = lambda: os.remove(export.create_jsonl(database, pasta, export_ids, comprimido=True))
+    return casos
+
+
+# Chamadas pesadas rodam menos vezes
+REPETICOES_LENTAS = {'verify_totais': 3, 'rebuild_totais': 3, 'create_excel': 3, 'create_pdf': 3,
+                     'create_csv': 5, 'create_jsonl_gz': 5, 'delete_listas': 10,
+                     'get_listas': 10, 'iter_export_rows': 10, 'iter_historico_itens': 5}
+
+
+def _commit_atual() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar(caminho: str, num_listas: int, itens_min: int, itens_max: int,
+             repeticoes: int, seed: int, cache_size: int = 0) -> dict:
+    """Gera o banco se necessário, mede tudo e devolve o relatório"""
+    novo = not os.path.exists(caminho)
+    database = Database(caminho, cache_size=cache_size)
+    geracao_ms = None
+    if novo:
+        inicio = time.perf_counter()
+        popular(database, num_listas, itens_min, itens_max, seed=seed)
+        geracao_ms = (time.perf_counter() - inicio) * 1000
+    ids = [lista_id for lista_id, _ in database.get_listas()]
+    total_itens = database._reader().execute("SELECT COUNT(*) FROM itens").fetchone()[0]
+
+    rng = random.Random(seed)
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        for nome, caso in _casos(database, ids, rng, pasta).items():
+            resultados[nome] = _medir(caso, REPETICOES_LENTAS.get(nome, repeticoes))
+            print(f"  {nome:<22}{resultados[nome]['mediana_ms']:>10.3f} ms")
+    cache = database.cache_stats() if cache_size else None
+    database.close()
+
+    return {
+        'meta': {
+            'listas': len(ids), 'itens': total_itens, 'geracao_ms': geracao_ms,
+            'commit': _commit_atual(), 'data': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'sqlite': sqlite3.sqlite_version,
+            'cache': cache,
+        },
+        'resultados': resultados,
+    }
+
+
+def comparar(base: dict, atual: dict, limite: float) -> List[str]:
+    """Métodos cuja mediana piorou além de limite x (ignorando ruído)"""
+    regressoes = []
+    for nome, medida in atual['resultados'].items():
+        anterior = base['resultados'].get(nome)
+        if not anterior:
+            continue
+        antes, depois = anterior['mediana_ms'], medida['mediana_ms']
+        if depois - antes > RUIDO_MS and depois > antes * limite:
+            regressoes.append(f"{nome}: {antes:.3f} -> {depois:.3f} ms ({depois / antes:.2f}x)")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--escala', choices=sorted(ESCALAS), default='media')
+    parser.add_argument('--listas', type=int, help="sobrescreve o nº de listas da escala")
+    parser.add_argument('--itens-min', type=int)
+    parser.add_argument('--itens-max', type=int)
+    parser.add_argument('--repeticoes', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--banco', help="arquivo do banco (reaproveitado se existir)")
+    parser.add_argument('--cache', type=int, default=0, help="cache_size do Database (0 = desligado)")
+    parser.add_argument('--saida', help="grava resultados em JSON")
+    parser.add_argument('--comparar', help="JSON de referência para detectar regressões")
+    parser.add_argument('--limite', type=float, default=1.25, help="fator máximo aceito (padrão 1.25)")
+    args = parser.parse_args()
+
+    listas, itens_min, itens_max = ESCALAS[args.escala]
+    listas = args.listas or listas
+    itens_min = args.itens_min or itens_min
+    itens_max = args.itens_max or itens_max
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = args.banco or os.path.join(pasta, 'bench.db')
+        print(f"📦 {args.escala}: {listas} listas, {itens_min}-{itens_max} itens/lista ({caminho})")
+        relatorio = executar(caminho, listas, itens_min, itens_max, args.repeticoes, args.seed,
+                               args.cache)
+    relatorio['meta']['escala'] = args.escala
+
+    if args.saida:
+        with open(args.saida, 'w') as f:
+            json.dump(relatorio, f, indent=2)
+        print(f"💾 {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar) as f:
+            regressoes = comparar(json.load(f), relatorio, args.limite)
+        if regressoes:
+            print(f"❌ {len(regressoes)} regressão(ões) acima de {args.limite}x:")
+            for linha in regressoes:
+                print(f"  {linha}")
+            sys.exit(1)
+        print("✅ Sem regressões")
+
+
+if __name__ == '__main__':
+    main()
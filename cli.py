@@ -0,0 +1,226 @@
+"""
+LISTA DE COMPRAS - Linha de comando (sem Kivy)
+Operações em lote para scripts/servidores, sobre o mesmo compras.db do app:
+
+    python cli.py listas [--filtro arroz] [--json]
+    python cli.py stats [ID ...] [--json]
+    python cli.py exportar xlsx|pdf|csv|csv.gz|jsonl|jsonl.gz [ID ...] [--pasta P] [--workers N] [--por-lista]
+    python cli.py importar ARQUIVO ... [--lista ID]
+
+Sem IDs, exportar/stats usam todas as listas. Exportação num arquivo só
+passa pela ExportQueue do app (PDF dividido entre os workers); --por-lista
+gera um arquivo por lista, em paralelo. Importação usa o mesmo parser da
+tela (controllers.importer): sem --lista, cada arquivo vira uma lista nova.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional
+
+from controllers.export import ExportCancelled
+from controllers.export_jobs import EXTENSOES, FORMATOS, ExportQueue
+from controllers.importer import RowError, parse_itens
+from models.database import Database
+from utils.log import get_logger
+
+log = get_logger('cli')
+
+# Extensão na linha de comando -> formato de export_jobs
+FORMATOS_CLI = {extensao: formato for formato, extensao in EXTENSOES.items()}
+
+
+def _todas(database: Database) -> List[int]:
+    """IDs de todas as listas (mais recentes primeiro)"""
+    return [lista.id for lista in database.iter_listas()]
+
+
+# ===== LISTAS / STATS =====
+def cmd_listas(database: Database, args) -> int:
+    if args.filtro:
+        listas = database.get_listas(args.filtro)
+        stats = database.get_listas_stats(tuple(lista.id for lista in listas))
+    else:
+        listas = database.iter_listas()  # streaming: banco grande não vira lista em memória
+        stats = database.get_listas_stats()
+    for lista in listas:
+        num_itens, num_comprados, total_comprado, total_pendente = stats.get(lista.id, (0, 0, 0.0, 0.0))
+        if args.json:
+            print(json.dumps({'id': lista.id, 'nome': lista.nome, 'itens': num_itens, 'comprados': num_comprados,
+                              'total_comprado': total_comprado, 'total_pendente': total_pendente},
+                             ensure_ascii=False))
+        else:
+            print(f"{lista.id:>6}  {lista.nome:<30} {num_comprados:>4}/{num_itens:<4} R${total_comprado:>10.2f}")
+    return 0
+
+
+def cmd_stats(database: Database, args) -> int:
+    stats = database.get_listas_stats(tuple(args.ids) if args.ids else None)
+    resumo = {
+        'listas': len(stats),
+        'itens': sum(s[0] for s in stats.values()),
+        'comprados': sum(s[1] for s in stats.values()),
+        'total_comprado': round(sum(s[2] for s in stats.values()), 2),
+        'total_pendente': round(sum(s[3] for s in stats.values()), 2),
+    }
+    if args.json:
+        print(json.dumps(resumo))
+    else:
+        for chave, valor in resumo.items():
+            print(f"{chave:<16}{valor}")
+    return 0
+
+
+# ===== EXPORTAÇÃO =====
+def _exportar_lista(formato: str, db_path: str, pasta: str, lista_id: int) -> str:
+    """Roda no worker: um arquivo por lista (nome fixo, sem colisão entre workers)"""
+    database = Database(db_path, auto_migrate=False)
+    try:
+        filename = os.path.join(pasta, f"lista_{lista_id}.{EXTENSOES[formato]}")
+        return FORMATOS[formato](database, pasta, [lista_id], filename=filename)
+    finally:
+        database.close()
+
+
+def _exportar_por_lista(formato: str, db_path: str, pasta: str, lista_ids: List[int], workers: int) -> int:
+    erros = 0
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = {pool.submit(_exportar_lista, formato, db_path, pasta, lista_id): lista_id
+                   for lista_id in lista_ids}
+        for future in as_completed(futures):
+            try:
+                print(future.result())
+            except Exception as e:
+                erros += 1
+                log.error("❌ Lista %s: %s", futures[future], e)
+    return 1 if erros else 0
+
+
+def _exportar_arquivo(formato: str, db_path: str, pasta: str, lista_ids: List[int], workers: int) -> int:
+    """Um arquivo com todas as listas, pela fila de exportação do app"""
+    fila = ExportQueue(db_path, workers=workers)
+    fim = threading.Event()
+    resultado: List[Optional[str]] = [None]
+
+    def on_progress(_, fracao: float):
+        print(f"\r📤 {fracao:.0%}", end='', file=sys.stderr, flush=True)
+
+    def on_done(_, filename: str):
+        resultado[0] = filename
+        fim.set()
+
+    def on_error(_, erro: Exception):
+        log.error("❌ Exportação falhou: %s", erro)
+        fim.set()
+
+    job_id = fila.submit(formato, pasta, lista_ids, on_progress, on_done, on_error)
+    try:
+        fim.wait()
+    except KeyboardInterrupt:
+        fila.cancel(job_id)
+        raise ExportCancelled()
+    finally:
+        fila.shutdown()
+    print(file=sys.stderr)
+    if resultado[0] is None:
+        return 1
+    print(resultado[0])
+    return 0
+
+
+def cmd_exportar(database: Database, args) -> int:
+    lista_ids = args.ids or _todas(database)
+    if not lista_ids:
+        log.warning("⚠️ Nenhuma lista para exportar")
+        return 1
+    formato = FORMATOS_CLI[args.formato]
+    os.makedirs(args.pasta, exist_ok=True)
+    database.close()  # os workers abrem suas próprias conexões
+    if args.por_lista:
+        return _exportar_por_lista(formato, args.banco, args.pasta, lista_ids, args.workers)
+    return _exportar_arquivo(formato, args.banco, args.pasta, lista_ids, args.workers)
+
+
+# ===== IMPORTAÇÃO =====
+def cmd_importar(database: Database, args) -> int:
+    if args.lista is not None and not database.lista_exists(args.lista):
+        log.error("❌ Lista %s não existe", args.lista)
+        return 1
+    falhas = 0
+    for caminho in args.arquivos:
+        # Abre antes de criar a lista: arquivo inexistente não deixa lista vazia
+        try:
+            arquivo = open(caminho, encoding='utf-8-sig')
+        except OSError as e:
+            log.error("❌ %s: %s", caminho, e.strerror or e)
+            falhas += 1
+            continue
+        erros: List[RowError] = []
+        nova = args.lista is None
+        lista_id = database.create_lista(os.path.splitext(os.path.basename(caminho))[0]) if nova else args.lista
+        try:
+            with arquivo:
+                importados = database.create_itens(lista_id, parse_itens(arquivo, erros))
+        except (UnicodeDecodeError, csv.Error) as e:
+            # create_itens é uma transação: nada foi gravado; a lista nova sai também
+            if nova:
+                database.delete_lista(lista_id)
+            log.error("❌ %s: %s", caminho, e)
+            falhas += 1
+            continue
+        print(f"{caminho}: {importados} itens -> lista {lista_id}")
+        for erro in erros:
+            print(f"  linha {erro.linha}: {erro.erro} ({erro.texto})", file=sys.stderr)
+        falhas += bool(erros)
+    return 1 if falhas else 0
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--banco', default='compras.db', help="arquivo do banco (padrão: compras.db)")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p = sub.add_parser('listas', help="lista as listas com contagens e total comprado")
+    p.add_argument('--filtro', default="")
+    p.add_argument('--json', action='store_true', help="uma linha JSON por lista")
+    p.set_defaults(func=cmd_listas)
+
+    p = sub.add_parser('stats', help="totais agregados")
+    p.add_argument('ids', type=int, nargs='*')
+    p.add_argument('--json', action='store_true')
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser('exportar', help="exporta listas (todas, sem IDs)")
+    p.add_argument('formato', choices=sorted(FORMATOS_CLI))
+    p.add_argument('ids', type=int, nargs='*')
+    p.add_argument('--pasta', default=os.getcwd())
+    p.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1))
+    p.add_argument('--por-lista', action='store_true', help="um arquivo por lista, em paralelo")
+    p.set_defaults(func=cmd_exportar)
+
+    p = sub.add_parser('importar', help="importa itens de CSV/texto (mesmo formato da tela)")
+    p.add_argument('arquivos', nargs='+')
+    p.add_argument('--lista', type=int, help="lista de destino (padrão: uma nova por arquivo)")
+    p.set_defaults(func=cmd_importar)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parser().parse_args(argv)
+    database = Database(args.banco)
+    try:
+        return args.func(database, args)
+    except ExportCancelled:
+        log.warning("⏹️ Exportação cancelada")
+        return 130
+    finally:
+        database.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+AUTOCOMPLETE - Sugestões de nome de item a partir do histórico
+Sem Kivy/Views. Índice de prefixos em memória: os nomes distintos já usados
+(sem acento, minúsculos) num array ordenado; o prefixo digitado vira uma
+faixa contígua achada por bisect. Carregado uma vez do banco
+(Database.iter_historico_itens) e atualizado a cada item criado.
+
+Ranking (frecência): cada uso de um nome soma exp(id / DECAIMENTO), ou seja,
+vale 1 quando acabou de ser criado e cai por um fator e a cada DECAIMENTO
+itens criados depois dele; pontos = ln da soma. Nome usado muitas vezes
+recentemente vence o usado uma vez agora, que vence o muito usado há muito
+tempo. Como o "agora" pesa igual para todos, a ordem não muda com o tempo.
+
+Prefixos com mais de LIMIAR nomes (os curtos, os mais digitados) têm o
+top-k guardado, calculado na carga; um item novo só sobe a pontuação do
+próprio nome, então esses top-k são corrigidos no lugar. Os demais varrem
+no máximo LIMIAR candidatos: toda consulta fica bem abaixo de 1 ms.
+Cada sugestão traz a última quantidade e o último preço usados.
+"""
+import bisect
+import heapq
+import math
+from operator import attrgetter
+from typing import Dict, Iterable, List, NamedTuple, Sequence
+
+from models.database import _fold
+
+DECAIMENTO = 1000    # itens criados para o peso de um uso cair por um fator e
+LIMIAR = 64          # acima disso, o top-k do prefixo fica guardado
+
+
+class Sugestao(NamedTuple):
+    nome: str
+    quantidade: float
+    preco_unit: float
+
+
+def _somar_log(a: float, b: float) -> float:
+    """ln(e^a + e^b) sem estourar"""
+    maior, menor = (a, b) if a >= b else (b, a)
+    return maior + math.log1p(math.exp(menor - maior))
+
+
+class _Entrada:
+    """Estatística de um nome (chave dobrada); nome exibido = o do último uso"""
+    __slots__ = ('nome', 'ultimo', 'quantidade', 'preco_unit', 'pontos')
+
+    def __init__(self, nome: str, item_id: int, quantidade: float, preco_unit: float):
+        self.nome = nome
+        self.ultimo = item_id
+        self.quantidade = quantidade
+        self.preco_unit = preco_unit
+        self.pontos = item_id / DECAIMENTO
+
+    def usar(self, nome: str, item_id: int, quantidade: float, preco_unit: float):
+        self.pontos = _somar_log(self.pontos, item_id / DECAIMENTO)
+        if item_id >= self.ultimo:
+            self.nome, self.ultimo = nome, item_id
+            self.quantidade, self.preco_unit = quantidade, preco_unit
+
+    def sugestao(self) -> Sugestao:
+        return Sugestao(self.nome, self.quantidade, self.preco_unit)
+
+
+def _chave(nome: str) -> str:
+    return " ".join(_fold(nome).split())
+
+
+class ItemAutocomplete:
+    """Prefixo -> até `limite` sugestões, mais usadas/recentes primeiro"""
+
+    def __init__(self, limite: int = 6):
+        self.limite = limite
+        self.carregado = False
+        self.ultimo_id = 0                      # maior id de item já contado
+        self._chaves: List[str] = []            # ordenado (bisect)
+        self._entradas: Dict[str, _Entrada] = {}
+        self._top: Dict[str, List[_Entrada]] = {}  # top-k dos prefixos com mais de LIMIAR nomes
+
+    def __len__(self) -> int:
+        return len(self._chaves)
+
+    def carregar(self, historico: Iterable[Sequence]) -> None:
+        """Monta o índice com (nome, id, qtd, preço) de cada item, em ordem de
+        id (Database.iter_historico_itens); rodar na thread do banco"""
+        entradas: Dict[str, _Entrada] = {}
+        chaves: Dict[str, str] = {}  # nome como digitado -> chave (dobra uma vez por nome)
+        for nome, item_id, quantidade, preco_unit in historico:
+            chave = chaves.get(nome)
+            if chave is None:
+                chave = chaves[nome] = _chave(nome or "")
+            if not chave:
+                continue
+            entrada = entradas.get(chave)
+            if entrada is None:
+                entradas[chave] = _Entrada(nome.strip(), item_id, quantidade, preco_unit)
+            else:  # "Arroz" e "arroz " são o mesmo nome
+                entrada.usar(nome.strip(), item_id, quantidade, preco_unit)
+            self.ultimo_id = max(self.ultimo_id, item_id)
+        self._entradas = entradas
+        self._chaves = sorted(entradas)
+        # Top-k dos prefixos grandes já calculado aqui, fora da UI: de um em
+        # um caractere, só descendo pelos prefixos que ainda passam do LIMIAR
+        self._top = {}
+        grandes = [""]
+        tamanho = 0
+        while grandes:
+            tamanho += 1
+            proximos = []
+            for base in grandes:
+                inicio, fim = self._faixa(base)
+                for prefixo in {chave[:tamanho] for chave in self._chaves[inicio:fim] if len(chave) >= tamanho}:
+                    inicio, fim = self._faixa(prefixo)
+                    if fim - inicio > LIMIAR:
+                        self._top[prefixo] = self._melhores(inicio, fim)
+                        proximos.append(prefixo)
+            grandes = proximos
+        self.carregado = True
+
+    def registrar(self, nome: str, quantidade: float, preco_unit: float, item_id: int) -> None:
+        """Item criado agora: conta o uso e passa a sugerir qtd/preço dele.
+        Ids já contados (carga que já viu o item) são ignorados"""
+        chave = _chave(nome)
+        if not chave or item_id <= self.ultimo_id:
+            return
+        self.ultimo_id = item_id
+        entrada = self._entradas.get(chave)
+        if entrada is None:
+            entrada = self._entradas[chave] = _Entrada(nome.strip(), item_id, quantidade, preco_unit)
+            bisect.insort(self._chaves, chave)
+        else:
+            entrada.usar(nome.strip(), item_id, quantidade, preco_unit)
+        for tamanho in range(1, len(chave) + 1):
+            top = self._top.get(chave[:tamanho])
+            if top is not None:
+                if entrada in top:
+                    top.remove(entrada)
+                posicao = 0
+                while posicao < len(top) and top[posicao].pontos >= entrada.pontos:
+                    posicao += 1
+                top.insert(posicao, entrada)
+                del top[self.limite:]
+
+    def sugerir(self, texto: str) -> List[Sugestao]:
+        prefixo = _chave(texto)
+        if not prefixo:
+            return []
+        if texto[-1:].isspace():
+            prefixo += " "  # "arroz " não sugere "arrozina"
+        melhores = self._top.get(prefixo)
+        if melhores is None:
+            inicio, fim = self._faixa(prefixo)
+            melhores = self._melhores(inicio, fim)
+            if fim - inicio > LIMIAR:  # cresceu com itens novos: guarda a partir de agora
+                self._top[prefixo] = melhores
+        return [entrada.sugestao() for entrada in melhores]
+
+    def _faixa(self, prefixo: str) -> tuple:
+        """[inicio, fim) das chaves que começam com prefixo"""
+        chaves = self._chaves
+        inicio = bisect.bisect_left(chaves, prefixo)
+        return inicio, bisect.bisect_left(chaves, prefixo + "\U0010ffff", inicio)
+
+    def _melhores(self, inicio: int, fim: int) -> List[_Entrada]:
+        entradas = self._entradas
+        candidatas = [entradas[chave] for chave in self._chaves[inicio:fim]]
+        return heapq.nlargest(self.limite, candidatas, key=attrgetter('pontos'))
@@ -0,0 +1,176 @@
+"""
+EXPORTAÇÃO - Geração de arquivos a partir do banco
+Sem Kivy/Views: usado pelo HomeController e por scripts (benchmarks)
+Excel/PDF para leitura; CSV e JSON Lines (opcionalmente .gz) para backup e
+análise, escritos linha a linha direto do cursor (memória constante)
+"""
+import csv
+import gzip
+import json
+import os
+from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
+from typing import IO, Callable, Iterator, List, Optional
+
+from models.database import Database
+from models.rows import ItemExportado
+
+FORMATO_MOEDA = '"R$" #,##0.00'
+
+# on_progress(n) é chamado a cada lista concluída; pode levantar ExportCancelled
+ProgressCallback = Optional[Callable[[int], None]]
+
+
+class ExportCancelled(Exception):
+    """Exportação interrompida pelo usuário"""
+
+
+def _filename(pasta: str, extensao: str) -> str:
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(pasta, f"lista_compras_{timestamp}.{extensao}")
+
+
+def _abrir_texto(filename: str, comprimido: bool) -> IO[str]:
+    if comprimido:
+        return gzip.open(filename, 'wt', encoding='utf-8', newline='')
+    return open(filename, 'w', encoding='utf-8', newline='')
+
+
+def _com_progresso(linhas: Iterator[ItemExportado], on_progress: ProgressCallback) -> Iterator[ItemExportado]:
+    """Repassa as linhas de iter_export_rows chamando on_progress a cada lista concluída"""
+    feitas, atual = 0, None
+    for linha in linhas:
+        if linha[0] != atual:
+            if atual is not None and on_progress:
+                on_progress(feitas)
+            feitas, atual = feitas + 1, linha[0]
+        yield linha
+    if atual is not None and on_progress:
+        on_progress(feitas)
+
+
+def create_csv(database: Database, pasta: str, lista_ids: List[int],
+               on_progress: ProgressCallback = None, filename: Optional[str] = None,
+               comprimido: bool = False) -> str:
+    """CSV (UTF-8, vírgula, ponto decimal) com uma linha por item"""
+    filename = filename or _filename(pasta, "csv.gz" if comprimido else "csv")
+    with _abrir_texto(filename, comprimido) as f:
+        writer = csv.writer(f)
+        writer.writerow(["lista_id", "lista", "item", "quantidade", "preco_unit", "comprado", "subtotal"])
+        for lista_id, nome_lista, nome, qtd, preco, comprado, subtotal in _com_progresso(
+                database.iter_export_rows(lista_ids), on_progress):
+            writer.writerow([lista_id, nome_lista, nome, qtd, preco, int(bool(comprado)),
+                             subtotal if comprado else 0.0])
+    return filename
+
+
+def create_jsonl(database: Database, pasta: str, lista_ids: List[int],
+                 on_progress: ProgressCallback = None, filename: Optional[str] = None,
+                 comprimido: bool = False) -> str:
+    """JSON Lines: um objeto por item, na ordem das listas"""
+    filename = filename or _filename(pasta, "jsonl.gz" if comprimido else "jsonl")
+    with _abrir_texto(filename, comprimido) as f:
+        for lista_id, nome_lista, nome, qtd, preco, comprado, _ in _com_progresso(
+                database.iter_export_rows(lista_ids), on_progress):
+            f.write(json.dumps({
+                'lista_id': lista_id, 'lista': nome_lista, 'item': nome,
+                'quantidade': qtd, 'preco_unit': preco, 'comprado': bool(comprado),
+            }, ensure_ascii=False))
+            f.write("\n")
+    return filename
+
+
+def create_excel(database: Database, pasta: str, lista_ids: List[int],
+                 on_progress: ProgressCallback = None, filename: Optional[str] = None) -> str:
+    """Excel em streaming: uma consulta JOIN ordenada -> workbook write-only.
+    Memória constante; valores numéricos de verdade; subtotal por lista e total geral"""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Listas")
+    negrito = Font(bold=True)
+
+    def moeda(valor: float, bold: bool = False) -> WriteOnlyCell:
+        cell = WriteOnlyCell(ws, value=valor)
+        cell.number_format = FORMATO_MOEDA
+        if bold:
+            cell.font = negrito
+        return cell
+
+    def rotulo(texto: str) -> WriteOnlyCell:
+        cell = WriteOnlyCell(ws, value=texto)
+        cell.font = negrito
+        return cell
+
+    ws.append(["Lista", "Item", "Qtd", "Preço", "Comprado", "Subtotal"])
+
+    total = 0.0
+    linhas = database.iter_export_rows(lista_ids)
+    for feitas, ((_, nome_lista), itens) in enumerate(groupby(linhas, key=itemgetter(0, 1)), 1):
+        subtotal_lista = 0.0
+        for _, _, nome, qtd, preco, comprado, subtotal in itens:
+            subtotal = subtotal if comprado else 0.0
+            subtotal_lista += subtotal
+            ws.append([nome_lista, nome, qtd, moeda(preco),
+                       "Sim" if comprado else "Não", moeda(subtotal)])
+        total += subtotal_lista
+        ws.append([rotulo(f"Subtotal {nome_lista}"), None, None, None, None,
+                   moeda(subtotal_lista, bold=True)])
+        if on_progress:
+            on_progress(feitas)
+
+    ws.append([rotulo("Total geral"), None, None, None, None, moeda(total, bold=True)])
+
+    filename = filename or _filename(pasta, "xlsx")
+    wb.save(filename)
+    return filename
+
+
+def create_pdf(database: Database, pasta: str, lista_ids: List[int],
+               on_progress: ProgressCallback = None, filename: Optional[str] = None,
+               titulo: bool = True, total_de: Optional[List[int]] = None) -> str:
+    """PDF com uma tabela por lista.
+    titulo/total_de permitem gerar partes para juntar depois: total_de=[] omite o total,
+    total_de=ids usa o total comprado dessas listas em vez das renderizadas"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib import colors
+
+    filename = filename or _filename(pasta, "pdf")
+    doc = SimpleDocTemplate(filename, pagesize=A4)
+    story = []
+    styles = getSampleStyleSheet()
+
+    if titulo:
+        story.append(Paragraph("🛒 Lista de Compras", styles['Title']))
+    total = 0.0
+
+    linhas = database.iter_export_rows(lista_ids)
+    for feitas, ((_, nome_lista), itens) in enumerate(groupby(linhas, key=itemgetter(0, 1)), 1):
+        story.append(Paragraph(nome_lista, styles['Heading2']))
+        data = [["Item", "Qtd", "Preço", "Status", "Total"]]
+        for _, _, nome, qtd, preco, comprado, subtotal in itens:
+            subtotal = subtotal if comprado else 0
+            if comprado: total += subtotal
+            data.append([nome, f"{qtd:.1f}", f"R${preco:.2f}",
+                       "✅" if comprado else "❌", f"R${subtotal:.2f}"])
+
+        t = Table(data)
+        t.setStyle(TableStyle([
+            ('BACKGROUND', (0,0), (-1,0), colors.grey),
+            ('GRID', (0,0), (-1,-1), 1, colors.black)
+        ]))
+        story.append(t)
+        if on_progress:
+            on_progress(feitas)
+
+    if total_de is not None:
+        total = sum(database.get_total_comprados(lista_id) for lista_id in total_de)
+    if total_de != []:
+        story.append(Paragraph(f"Total: R$ {total:.2f}", styles['Heading3']))
+    doc.build(story)
+    return filename
@@ -0,0 +1,93 @@
+"""
+CACHE DE EXPORTAÇÕES - Arquivos prontos reaproveitados
+Sem Kivy. Chave = formato + listas (na ordem) + revisão de cada uma
+(lista_totais.revisao, sobe a cada mudança); mesma chave -> mesmo conteúdo,
+então a exportação vira uma cópia do arquivo. Despejo por tamanho total
+(menos usados primeiro, pelo mtime).
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from typing import Dict, List, Optional
+
+from utils.log import get_logger
+
+log = get_logger('export_cache')
+
+# Subir quando o layout dos arquivos mudar (invalida o que está em disco)
+VERSAO_LAYOUT = 1
+
+
+class ExportCache:
+    """Diretório de arquivos exportados, limitado a max_bytes"""
+
+    def __init__(self, pasta: str, max_bytes: int = 50 * 1024 * 1024):
+        self.pasta = pasta
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def chave(formato: str, lista_ids: List[int], revisoes: Dict[int, int]) -> str:
+        """Hash do que determina o conteúdo do arquivo"""
+        partes = [VERSAO_LAYOUT, formato, [(lista_id, revisoes.get(lista_id)) for lista_id in lista_ids]]
+        return hashlib.sha256(json.dumps(partes).encode()).hexdigest()
+
+    def get(self, chave: str, extensao: str) -> Optional[str]:
+        """Caminho do arquivo em cache (None se não houver)"""
+        caminho = os.path.join(self.pasta, f"{chave}.{extensao}")
+        with self._lock:
+            try:
+                os.utime(caminho)  # marca como usado (LRU)
+            except OSError:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return caminho
+
+    def copiar(self, chave: str, extensao: str, destino: str) -> Optional[str]:
+        """Copia o arquivo em cache para destino; None se não houver"""
+        caminho = self.get(chave, extensao)
+        if caminho is None:
+            return None
+        try:
+            shutil.copyfile(caminho, destino)
+        except FileNotFoundError:  # despejado entre get() e a cópia
+            return None
+        return destino
+
+    def put(self, chave: str, extensao: str, arquivo: str) -> None:
+        """Guarda uma cópia de arquivo sob a chave e despeja o excedente"""
+        os.makedirs(self.pasta, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.pasta, suffix='.tmp')
+        os.close(fd)
+        try:
+            shutil.copyfile(arquivo, tmp)
+            os.replace(tmp, os.path.join(self.pasta, f"{chave}.{extensao}"))  # atômico
+        except OSError as e:
+            log.warning("⚠️ Não foi possível guardar exportação em cache: %s", e)
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        self._despejar()
+
+    def _despejar(self) -> None:
+        with self._lock:
+            arquivos = []
+            for entrada in os.scandir(self.pasta):
+                if entrada.is_file() and not entrada.name.endswith('.tmp'):
+                    info = entrada.stat()
+                    arquivos.append((info.st_mtime, info.st_size, entrada.path))
+            total = sum(tamanho for _, tamanho, _ in arquivos)
+            for _, tamanho, caminho in sorted(arquivos):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(caminho)
+                except OSError:
+                    continue
+                total -= tamanho
+                log.debug("🧹 Exportação despejada do cache: %s", os.path.basename(caminho))
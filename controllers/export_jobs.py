@@ -0,0 +1,300 @@
+"""
+EXPORTAÇÃO EM BACKGROUND - Fila de jobs com progresso e cancelamento
+Jobs rodam um por vez (FIFO) num pool de processos; PDFs com várias listas
+são divididos em partes renderizadas em paralelo e depois juntadas (pypdf)
+Sem Kivy: progresso/resultado são entregues pelo dispatcher (Clock no app)
+Com ExportCache, listas sem mudança desde a última exportação viram cópia do arquivo
+"""
+import multiprocessing
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from functools import partial
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+from controllers import export
+from controllers.export import ExportCancelled
+from controllers.export_cache import ExportCache
+from models.database import Database, db
+from utils.log import get_logger
+
+log = get_logger('export')
+
+FORMATOS = {
+    'excel': export.create_excel,
+    'pdf': export.create_pdf,
+    'csv': export.create_csv,
+    'csv_gz': partial(export.create_csv, comprimido=True),
+    'jsonl': export.create_jsonl,
+    'jsonl_gz': partial(export.create_jsonl, comprimido=True),
+}
+EXTENSOES = {'excel': 'xlsx', 'pdf': 'pdf', 'csv': 'csv', 'csv_gz': 'csv.gz',
+             'jsonl': 'jsonl', 'jsonl_gz': 'jsonl.gz'}
+
+
+def _call_direct(func: Callable[[], None]) -> None:
+    func()
+
+
+def _pypdf_disponivel() -> bool:
+    try:
+        import pypdf  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _render_parte(formato: str, db_path: str, pasta: str, lista_ids: List[int],
+                  opcoes: dict, eventos, cancelado, parte: int) -> str:
+    """Roda no worker: abre o banco, gera a parte e reporta (parte, listas feitas)"""
+    def on_progress(feitas: int):
+        if cancelado.is_set():
+            raise ExportCancelled()
+        eventos.put((parte, feitas))
+
+    database = Database(db_path, auto_migrate=False)  # o app já migrou
+    try:
+        return FORMATOS[formato](database, pasta, lista_ids, on_progress=on_progress, **opcoes)
+    finally:
+        database.close()
+
+
+class ExportJob:
+    """Estado de uma exportação na fila"""
+
+    def __init__(self, job_id: int, formato: str, pasta: str, lista_ids: List[int],
+                 on_progress: Optional[Callable[[int, float], None]],
+                 on_done: Optional[Callable[[int, str], None]],
+                 on_error: Optional[Callable[[int, Exception], None]]):
+        self.job_id = job_id
+        self.formato = formato
+        self.pasta = pasta
+        self.lista_ids = list(lista_ids)
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancelado = None  # Event criado quando o job começa
+        self.cancelar_pedido = False
+
+
+class ExportQueue:
+    """Fila de exportações: submit() retorna job_id; cancel(job_id) interrompe"""
+
+    def __init__(self, db_path: str = 'compras.db', workers: Optional[int] = None,
+                 dispatcher: Callable[[Callable[[], None]], None] = _call_direct,
+                 cache: Optional[ExportCache] = None):
+        self.db_path = db_path
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.dispatcher = dispatcher
+        self.cache = cache
+        self._database: Optional[Database] = None  # revisões (thread da fila)
+        self._jobs: "queue.Queue[Optional[ExportJob]]" = queue.Queue()
+        self._pendentes: Dict[int, ExportJob] = {}
+        self._lock = threading.Lock()
+        self._proximo_id = 0
+        self._executor: Optional[Executor] = None
+        self._manager = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ===== API =====
+    def submit(self, formato: str, pasta: str, lista_ids: List[int],
+               on_progress: Optional[Callable[[int, float], None]] = None,
+               on_done: Optional[Callable[[int, str], None]] = None,
+               on_error: Optional[Callable[[int, Exception], None]] = None) -> int:
+        """Enfileira exportação e retorna o ID do job"""
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato desconhecido: {formato}")
+        with self._lock:
+            self._proximo_id += 1
+            job = ExportJob(self._proximo_id, formato, pasta, lista_ids, on_progress, on_done, on_error)
+            self._pendentes[job.job_id] = job
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name='export-queue', daemon=True)
+                self._thread.start()
+        self._jobs.put(job)
+        return job.job_id
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancela job na fila ou em andamento (para na próxima lista)"""
+        with self._lock:
+            job = self._pendentes.get(job_id)
+            if job is None:
+                return False
+            job.cancelar_pedido = True
+            if job.cancelado is not None:
+                job.cancelado.set()
+        return True
+
+    def pending(self) -> int:
+        """Jobs na fila + em andamento"""
+        with self._lock:
+            return len(self._pendentes)
+
+    def shutdown(self) -> None:
+        """Cancela tudo e encerra workers (chamar no on_stop do app)"""
+        with self._lock:
+            ids = list(self._pendentes)
+        for job_id in ids:
+            self.cancel(job_id)
+        if self._thread is not None:
+            self._jobs.put(None)
+            self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        if self._manager is not None:
+            self._manager.shutdown()
+        if self._database is not None:
+            self._database.close()
+
+    # ===== INTERNO =====
+    def _pool(self) -> Executor:
+        """Processos quando a plataforma permite; senão threads (ex.: Android)"""
+        if self._executor is None:
+            try:
+                ctx = multiprocessing.get_context('spawn')
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx)
+                self._manager = ctx.Manager()
+            except (ImportError, NotImplementedError, OSError):
+                self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                    thread_name_prefix='export')
+        return self._executor
+
+    def _novo_canal(self):
+        """(fila de progresso, evento de cancelamento) compatíveis com o pool"""
+        if self._manager is not None:
+            return self._manager.Queue(), self._manager.Event()
+        return queue.Queue(), threading.Event()
+
+    def _dividir(self, job: ExportJob, pasta_tmp: str) -> List[tuple]:
+        """Partes (lista_ids, opções). PDF grande -> uma parte por worker"""
+        n_partes = 1
+        if job.formato == 'pdf' and len(job.lista_ids) > 1 and _pypdf_disponivel():
+            n_partes = min(self.workers, len(job.lista_ids))
+        if n_partes == 1:
+            return [(job.lista_ids, {})]
+
+        tamanho = -(-len(job.lista_ids) // n_partes)
+        partes = []
+        for i in range(n_partes):
+            ids = job.lista_ids[i * tamanho:(i + 1) * tamanho]
+            if not ids:
+                continue
+            partes.append((ids, {
+                'filename': os.path.join(pasta_tmp, f"parte_{i:03d}.pdf"),
+                'titulo': i == 0,
+                'total_de': [],
+            }))
+        # Total geral só na última parte, somando todas as listas
+        partes[-1][1]['total_de'] = job.lista_ids
+        return partes
+
+    def _loop(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            filename, erro = None, None
+            try:
+                if job.cancelar_pedido:
+                    raise ExportCancelled()
+                filename = self._executar(job)
+            except Exception as e:
+                erro = e
+            with self._lock:
+                self._pendentes.pop(job.job_id, None)
+            if erro is None and job.on_done:
+                self.dispatcher(lambda j=job, f=filename: j.on_done(j.job_id, f))
+            elif erro is not None and job.on_error:
+                self.dispatcher(lambda j=job, e=erro: j.on_error(j.job_id, e))
+
+    def _chave_cache(self, job: ExportJob) -> Optional[str]:
+        """Chave do arquivo no cache, com as revisões lidas ANTES de renderizar"""
+        if self.cache is None:
+            return None
+        if self._database is None:
+            self._database = Database(self.db_path)
+        revisoes = self._database.get_revisoes(tuple(job.lista_ids))
+        return ExportCache.chave(job.formato, job.lista_ids, revisoes)
+
+    def _executar(self, job: ExportJob) -> str:
+        extensao = EXTENSOES[job.formato]
+        chave = self._chave_cache(job)
+        if chave is not None:
+            copia = self.cache.copiar(chave, extensao, export._filename(job.pasta, extensao))
+            if copia is not None:
+                log.info("♻️ Exportação sem mudanças: copiada do cache")
+                return copia
+        filename = self._renderizar(job)
+        if chave is not None:
+            self.cache.put(chave, extensao, filename)
+        return filename
+
+    def _renderizar(self, job: ExportJob) -> str:
+        pool = self._pool()
+        eventos, cancelado = self._novo_canal()
+        with self._lock:
+            job.cancelado = cancelado
+            if job.cancelar_pedido:
+                cancelado.set()
+
+        # Renderiza numa pasta temporária dentro do destino (mesmo disco: o
+        # os.replace final é atômico); cancelado/erro -> some com o rmtree
+        pasta_tmp = tempfile.mkdtemp(prefix='.export_', dir=job.pasta)
+        try:
+            partes = self._dividir(job, pasta_tmp)
+            futures = [
+                pool.submit(_render_parte, job.formato, self.db_path, pasta_tmp,
+                            ids, opcoes, eventos, cancelado, i)
+                for i, (ids, opcoes) in enumerate(partes)
+            ]
+            feitas: Dict[int, int] = {}
+            total = max(1, len(job.lista_ids))
+            pendentes = set(futures)
+            while pendentes:
+                _, pendentes = wait(pendentes, timeout=0.1)
+                self._drenar(eventos, feitas)
+                if job.on_progress and feitas:
+                    # Render final (doc.build/save) acontece depois da última lista
+                    fracao = min(0.95, sum(feitas.values()) / total)
+                    self.dispatcher(lambda j=job, f=fracao: j.on_progress(j.job_id, f))
+
+            arquivos = [f.result() for f in futures]  # propaga erro/cancelamento
+            if len(arquivos) == 1:
+                pronto = arquivos[0]
+            else:
+                pronto = self._juntar_pdfs(arquivos, pasta_tmp)
+            filename = os.path.join(job.pasta, os.path.basename(pronto))
+            os.replace(pronto, filename)
+            return filename
+        finally:
+            shutil.rmtree(pasta_tmp, ignore_errors=True)
+
+    @staticmethod
+    def _drenar(eventos, feitas: Dict[int, int]) -> None:
+        while True:
+            try:
+                parte, n = eventos.get_nowait()
+            except queue.Empty:
+                return
+            feitas[parte] = max(feitas.get(parte, 0), n)
+
+    @staticmethod
+    def _juntar_pdfs(arquivos: List[str], pasta: str) -> str:
+        from pypdf import PdfWriter
+        writer = PdfWriter()
+        for arquivo in arquivos:
+            writer.append(arquivo)
+        filename = export._filename(pasta, "pdf")
+        with open(filename, 'wb') as f:
+            writer.write(f)
+        return filename
+
+
+# Instância global (mesmo arquivo do singleton síncrono; cache ao lado do banco)
+export_queue = ExportQueue(
+    db.db_path,
+    cache=ExportCache(os.path.join(os.path.dirname(os.path.abspath(db.db_path)), '.export_cache'))
+)
@@ -3,10 +3,17 @@ CONTROLLER HOME - Lógica de Negócio (MVC)
 Mediador entre Model e View
 """
 import os
-from datetime import datetime
-from typing import List, Tuple
-from models.database import db
+from typing import Callable, List
+from models.async_database import adb
+from controllers.export import ExportCancelled
+from controllers.export_jobs import export_queue
+from controllers.search_cache import SearchCache, casa
 from views.home_view import HomeView
+from utils.log import get_logger
+
+log = get_logger('home')
+
+PAGINA = 100  # listas por página (rolagem infinita)
 
 
 class HomeController:
@@ -14,32 +21,143 @@ class HomeController:
         self.view = view
         self.lista_controller = lista_controller
         self.selecionadas = set()
+        self.view.selecionadas = self.selecionadas  # ✅ MESMO SET NA VIEW
+        self.stats = {}
+        self.view.stats = self.stats  # ✅ MESMO DICT NA VIEW (agregados por lista)
+        self._geracao = 0  # descarta respostas de recargas antigas
+        self._busca = SearchCache()  # refina filtros em memória enquanto digita
+        self._filtro = ""     # filtro das listas exibidas
+        self._cursor = None   # menor id já carregado (keyset)
+        self._fim = True      # não há mais páginas
+        self._paginando = False
     
     def handle_event(self, action: str, *args):
         """Dispatcher central de eventos"""
-        print(f"🔥 EVENTO: {action}, args: {args}")  # DEBUG
+        log.debug("🔥 EVENTO: %s, args: %s", action, args)
         handlers = {
             'create_lista': self.create_lista,
             'filter_lists': self.filter_lists,
+            'load_more_listas': self.load_more_listas,
+            'refresh_stats': self.refresh_stats,
             'export_selected': self.export_selected,
             'export_excel': self.export_excel,
             'export_pdf': self.export_pdf,
+            'export_formato': self.export_formato,
+            'cancel_export': self.cancel_export,
             'confirm_delete_lista': self.confirm_delete_lista,
+            'delete_selected': self.delete_selected,
+            'toggle_selecao': self.toggle_selecao,
             'open_lista': self.open_lista
         }
         handlers[action](*args)
     
+    def _async(self, executar: Callable, func: Callable, callback: Callable):
+        """Roda func(db) fora da UI (adb.read/adb.write) com indicador de carregamento"""
+        self.view.set_loading(True)
+        
+        def ok(resultado):
+            self.view.set_loading(False)
+            callback(resultado)
+        
+        def erro(e: Exception):
+            self.view.set_loading(False)
+            self.view.show_message(f"❌ Erro: {str(e)}")
+        
+        return executar(func, ok, erro)
+    
     def create_lista(self, nome: str):
-        db.create_lista(nome)
-        self.refresh_listas()
+        self._busca.invalidar()
+        
+        def pronto(resultado):
+            lista_id, prefixo = resultado
+            self.stats[lista_id] = (0, 0, 0.0, 0.0)  # entra no refresh_stats
+            # Com filtro ativo, só entra na tela se casar com ele
+            if not self._filtro or casa(nome, self._filtro, prefixo):
+                self.view.insert_lista(lista_id, nome)
+        
+        self._async(adb.write, lambda d: (d.create_lista(nome), d.fts_enabled), pronto)
     
     def filter_lists(self, filtro: str):
         self.refresh_listas(filtro)
     
     def refresh_listas(self, filtro: str = ""):
-        listas = db.get_listas(filtro)
-        if self.view:
+        self._geracao += 1
+        geracao = self._geracao
+        self._filtro = filtro
+        self._fim = True
+        self._paginando = False
+        if not filtro:
+            # ✅ Sem filtro: só a primeira página; o resto vem ao rolar
+            def primeira(resultado):
+                listas, stats = resultado
+                if self.view and geracao == self._geracao:
+                    self.stats.update(stats)
+                    self._avancar(listas)
+                    self.view.update_listas(listas, self.selecionadas)
+            
+            self._async(adb.read, lambda d: self._com_stats(d, d.get_listas_page(None, PAGINA)), primeira)
+            return
+        listas = self._busca.buscar('listas', filtro)
+        if listas is not None:
+            # ✅ Refinado em memória: atualiza no mesmo frame, sem ir ao banco
             self.view.update_listas(listas, self.selecionadas)
+            return
+        versao = self._busca.versao
+        
+        def consultar(d):
+            listas, stats = self._com_stats(d, d.get_listas(filtro))
+            return listas, stats, SearchCache.preparar(listas), d.fts_enabled
+        
+        def pronto(resultado):
+            listas, stats, dobrados, prefixo = resultado
+            self.stats.update(stats)
+            self._busca.guardar('listas', filtro, listas, dobrados, prefixo, versao)
+            if self.view and geracao == self._geracao:
+                self.view.update_listas(listas, self.selecionadas)
+        
+        self._async(adb.read, consultar, pronto)
+    
+    def load_more_listas(self):
+        """Próxima página quando a rolagem chega perto do fim"""
+        if self._fim or self._paginando:
+            return
+        self._paginando = True
+        geracao = self._geracao
+        cursor = self._cursor
+        
+        def pronto(resultado):
+            listas, stats = resultado
+            if geracao == self._geracao:
+                self._paginando = False
+                self.stats.update(stats)
+                self._avancar(listas)
+                self.view.append_listas(listas)
+        
+        self._async(adb.read, lambda d: self._com_stats(d, d.get_listas_page(cursor, PAGINA)), pronto)
+    
+    @staticmethod
+    def _com_stats(d, listas: List) -> tuple:
+        """Listas + agregados delas numa consulta só (constante, não 1 por lista)"""
+        return listas, d.get_listas_stats(tuple(lista_id for lista_id, _ in listas))
+    
+    def refresh_stats(self):
+        """Relê os agregados das listas já carregadas (ex.: ao voltar da tela de itens)"""
+        if not self.stats:
+            return
+        lista_ids = tuple(self.stats)
+        
+        def pronto(stats):
+            self.stats.update(stats)
+            self.view.update_stats()
+        
+        # Fila de escrita: lê depois das marcações gravadas ao sair da lista
+        adb.write(lambda d: d.get_listas_stats(lista_ids), pronto)
+    
+    def _avancar(self, pagina: List):
+        """Move o cursor para o fim da página recebida"""
+        self._fim = len(pagina) < PAGINA
+        if pagina:
+            self._cursor = pagina[-1][0]
     
     def export_selected(self):
         if self.selecionadas:
@@ -50,21 +168,45 @@ class HomeController:
             self.selecionadas.add(lista_id)
         else:
             self.selecionadas.discard(lista_id)
-        self.refresh_listas()
+        self.view.update_selecao(lista_id, ativo)
     
     def export_excel(self, lista_ids: List[int]):
-        self._export_file(lista_ids, self._create_excel)
+        self._export_file(lista_ids, 'excel')
     
     def export_pdf(self, lista_ids: List[int]):
-        self._export_file(lista_ids, self._create_pdf)
+        self._export_file(lista_ids, 'pdf')
     
-    def _export_file(self, lista_ids: List[int], create_func):
-        try:
-            pasta = self._choose_folder()
-            filename = create_func(pasta, lista_ids)
-            self.view.show_message(f"✅ {os.path.basename(filename)} salvo!")
-        except Exception as e:
-            self.view.show_message(f"❌ Erro: {str(e)}")
+    def export_formato(self, lista_ids: List[int], formato: str):
+        """CSV/JSON Lines (e variantes .gz); ver export_jobs.FORMATOS"""
+        self._export_file(lista_ids, formato)
+    
+    def _export_file(self, lista_ids: List[int], formato: str):
+        """Enfileira a exportação; o arquivo é gerado fora da thread de UI"""
+        pasta = self._choose_folder()
+        job_id = export_queue.submit(
+            formato, pasta, lista_ids,
+            on_progress=self._on_export_progress,
+            on_done=self._on_export_done,
+            on_error=self._on_export_error
+        )
+        self.view.show_export_progress(job_id, 0.0, export_queue.pending())
+    
+    def cancel_export(self, job_id: int):
+        export_queue.cancel(job_id)
+    
+    def _on_export_progress(self, job_id: int, fracao: float):
+        self.view.show_export_progress(job_id, fracao, export_queue.pending())
+    
+    def _on_export_done(self, job_id: int, filename: str):
+        self.view.hide_export_progress(export_queue.pending())
+        self.view.show_message(f"✅ {os.path.basename(filename)} salvo!")
+    
+    def _on_export_error(self, job_id: int, erro: Exception):
+        self.view.hide_export_progress(export_queue.pending())
+        if isinstance(erro, ExportCancelled):
+            self.view.show_message("⏹️ Exportação cancelada")
+        else:
+            self.view.show_message(f"❌ Erro: {str(erro)}")
     
     def _choose_folder(self) -> str:
         """Escolha de pasta (simplificado)"""
@@ -75,76 +217,40 @@ class HomeController:
         except:
             return os.getcwd()
     
-    def _create_excel(self, pasta: str, lista_ids: List[int]) -> str:
-        from openpyxl import Workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.append(["Lista", "Item", "Qtd", "Preço", "Comprado", "Subtotal"])
-        
-        total = 0
-        for lista_id in lista_ids:
-            nome_lista = db.get_lista_nome(lista_id)
-            for item in db.get_itens(lista_id):
-                _, nome, qtd, preco, comprado = item
-                subtotal = qtd * preco if comprado else 0
-                if comprado: total += subtotal
-                ws.append([nome_lista, nome, qtd, f"R${preco:.2f}", 
-                          "Sim" if comprado else "Não", f"R${subtotal:.2f}"])
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = os.path.join(pasta, f"lista_compras_{timestamp}.xlsx")
-        wb.save(filename)
-        return filename
-    
-    def _create_pdf(self, pasta: str, lista_ids: List[int]) -> str:
-        from reportlab.lib.pagesizes import A4
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle, Spacer
-        from reportlab.lib.styles import getSampleStyleSheet
-        from reportlab.lib import colors
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = os.path.join(pasta, f"lista_compras_{timestamp}.pdf")
-        doc = SimpleDocTemplate(filename, pagesize=A4)
-        story = []
-        styles = getSampleStyleSheet()
+    def confirm_delete_lista(self, lista_id: int):
+        def removida(_):
+            self.stats.pop(lista_id, None)
+            self.view.remove_lista(lista_id)
         
-        story.append(Paragraph("🛒 Lista de Compras", styles['Title']))
-        total = 0
+        def on_confirm(dialog):
+            self.selecionadas.discard(lista_id)
+            self._busca.invalidar()
+            self._async(adb.write, lambda d: d.delete_lista(lista_id), removida)
+            dialog.dismiss()
+        self.view.show_confirm_dialog("Excluir Lista?", "Todos os itens serão removidos.", on_confirm)
+    
+    def delete_selected(self):
+        """Exclui as listas selecionadas: uma transação e um único refresh da tela"""
+        if not self.selecionadas:
+            return
+        lista_ids = list(self.selecionadas)
         
-        for lista_id in lista_ids:
-            nome_lista = db.get_lista_nome(lista_id)
-            itens = db.get_itens(lista_id)
-            if itens:
-                story.append(Paragraph(nome_lista, styles['Heading2']))
-                data = [["Item", "Qtd", "Preço", "Status", "Total"]]
-                for _, nome, qtd, preco, comprado in itens:
-                    subtotal = qtd * preco if comprado else 0
-                    if comprado: total += subtotal
-                    data.append([nome, f"{qtd:.1f}", f"R${preco:.2f}", 
-                               "✅" if comprado else "❌", f"R${subtotal:.2f}"])
-                
-                t = Table(data)
-                t.setStyle(TableStyle([
-                    ('BACKGROUND', (0,0), (-1,0), colors.grey),
-                    ('GRID', (0,0), (-1,-1), 1, colors.black)
-                ]))
-                story.append(t)
+        def removidas(_):
+            for lista_id in lista_ids:
+                self.stats.pop(lista_id, None)
+            self.view.remove_listas(lista_ids)
         
-        story.append(Paragraph(f"Total: R$ {total:.2f}", styles['Heading3']))
-        doc.build(story)
-        return filename
-    
-    def confirm_delete_lista(self, lista_id: int):
         def on_confirm(dialog):
-            db.delete_lista(lista_id)
-            if lista_id in self.selecionadas:
-                self.selecionadas.discard(lista_id)
-            self.refresh_listas()
+            self.selecionadas.difference_update(lista_ids)
+            self._busca.invalidar()
+            self._async(adb.write, lambda d: d.delete_listas(lista_ids), removidas)
             dialog.dismiss()
-        self.view.show_confirm_dialog("Excluir Lista?", "Todos os itens serão removidos.", on_confirm)
+        self.view.show_confirm_dialog(
+            f"Excluir {len(lista_ids)} lista(s)?", "Todos os itens serão removidos.", on_confirm
+        )
     
     def open_lista(self, lista_id: int):
         """Navega para tela de itens"""
-        print(f"🚀 Abrindo lista ID: {lista_id}")  # DEBUG
+        log.debug("🚀 Abrindo lista ID: %s", lista_id)
         self.lista_controller.show_lista(lista_id)
         self.view.sm.current = 'lista'  # ✅ MUDA PARA TELA DE ITENS
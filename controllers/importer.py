@@ -0,0 +1,84 @@
+"""
+IMPORTAÇÃO - Parser de itens em CSV ou texto colado (uma linha por item)
+Sem Kivy/Views. Gera linhas válidas sob demanda (streaming) para executemany
+Formatos aceitos por linha:
+    Arroz 5kg;2;25,90        (CSV com ; , ou TAB, aspas opcionais)
+    Arroz 5kg 2 25,90        (texto: os dois últimos termos são qtd e preço)
+O formato é decidido linha a linha (texto colado pode misturar os dois).
+"""
+import csv
+import re
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+DELIMITADORES = (';', '\t', ',')
+
+
+class RowError(NamedTuple):
+    """Linha rejeitada na validação"""
+    linha: int
+    texto: str
+    erro: str
+
+
+def _numero(texto: str) -> Optional[float]:
+    """'25,90' / 'R$ 1.234,56' / '2' -> float (None se inválido, inclusive '5 4')"""
+    valor = texto.strip().replace('R$', '').strip()
+    if ',' in valor:
+        valor = valor.replace('.', '').replace(',', '.')
+    try:
+        return float(valor)
+    except ValueError:
+        return None
+
+
+def _numericos(campos: List[str]) -> bool:
+    return _numero(campos[1]) is not None and _numero(campos[2]) is not None
+
+
+def _campos(texto: str) -> List[str]:
+    """Separa nome/qtd/preço decidindo o formato a cada linha. Um delimitador
+    só vale se der exatamente 3 campos com qtd e preço numéricos; senão os
+    dois últimos termos do texto ("Banana 1,5 4,99": vírgula é decimal).
+    Sem formato válido, devolve a divisão em 3 campos que houver (cabeçalho
+    ou mensagem de erro), ou [] se nenhuma"""
+    candidatos = []
+    for delimitador in DELIMITADORES:
+        if delimitador in texto:
+            campos = [c.strip() for c in next(csv.reader([texto], delimiter=delimitador), [])]
+            if len(campos) == 3:
+                if _numericos(campos):
+                    return campos
+                candidatos.append(campos)
+    partes = texto.rsplit(None, 2)
+    if len(partes) == 3:
+        if _numericos(partes):
+            return partes
+        candidatos.append(partes)
+    return candidatos[0] if candidatos else []
+
+
+def parse_itens(linhas: Iterable[str], erros: List[RowError]) -> Iterator[Tuple[str, float, float]]:
+    """Gera (nome, qtd, preço) válidos; rejeitados vão para `erros`.
+    Mesmas regras da tela: nome não vazio, qtd > 0 e preço > 0"""
+    primeira = True
+    for numero, bruto in enumerate(linhas, 1):
+        texto = bruto.strip()
+        if not texto or texto.startswith('#'):
+            continue
+        campos = _campos(texto)
+        cabecalho, primeira = primeira, False
+        if not campos:
+            erros.append(RowError(numero, texto, "esperado: nome, qtd, preço"))
+            continue
+
+        nome, qtd, preco = campos[0], _numero(campos[1]), _numero(campos[2])
+        if qtd is None and preco is None and cabecalho:
+            continue  # cabeçalho (ex.: "nome;qtd;preco")
+        if not nome:
+            erros.append(RowError(numero, texto, "nome vazio"))
+        elif qtd is None or qtd <= 0:
+            erros.append(RowError(numero, texto, f"quantidade inválida: {campos[1]!r}"))
+        elif preco is None or preco <= 0:
+            erros.append(RowError(numero, texto, f"preço inválido: {campos[2]!r}"))
+        else:
+            yield re.sub(r"\s+", " ", nome), qtd, preco
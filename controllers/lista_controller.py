@@ -1,25 +1,67 @@
 """
 CONTROLLER LISTA - Lógica de itens (MVC)
 """
-from typing import List, Tuple, Callable
-from models.database import db
+import io
+from typing import IO, List, Optional, Tuple, Callable
+from models.async_database import adb
+from models.rows import Item
+from controllers.autocomplete import ItemAutocomplete
+from controllers.importer import parse_itens
+from controllers.search_cache import SearchCache, casa
+from controllers.write_behind import WriteBehind
+from utils.log import get_logger
+
+log = get_logger('lista')
+
+PAGINA = 100  # itens por página (rolagem infinita)
 
 
 class ListaController:
     def __init__(self, lista_view, home_view):
-        self.lista_view = lista_view      # ✅ REFERÊNCIA OBRIGATÓRIA
+        # lista_view: a própria view ou uma fábrica chamada na primeira navegação
+        self._lista_view = None
+        self._lista_view_factory = None
+        if callable(lista_view):
+            self._lista_view_factory = lista_view
+        else:
+            self._set_view(lista_view)
         self.home_view = home_view        # ✅ REFERÊNCIA OBRIGATÓRIA
-        self.lista_view.controller = self  # ✅ INJEÇÃO INVERSA
+        self._geracao = 0  # descarta respostas de recargas antigas
+        self._busca = SearchCache()  # itens da lista aberta, refinados enquanto digita
+        self._filtro = ""     # filtro da lista exibida
+        self._cursor = 0      # maior id já carregado (keyset)
+        self._fim = True      # não há mais páginas
+        self._paginando = False
+        # ✅ Marcações: na view na hora, no banco em lote (write-behind)
+        self._marcacoes = WriteBehind(adb, on_flushed=self._on_marcacoes_gravadas)
+        # ✅ Autocomplete do nome: índice do histórico em memória, montado uma vez
+        self._sugestoes = ItemAutocomplete(limite=4)
+        self._novos_itens: Optional[List[Item]] = None  # criados durante a carga do índice
+    
+    def _set_view(self, lista_view):
+        self._lista_view = lista_view      # ✅ REFERÊNCIA OBRIGATÓRIA
+        self._lista_view.controller = self  # ✅ INJEÇÃO INVERSA
+    
+    @property
+    def lista_view(self):
+        """ListaView construída só quando usada (startup mais rápido)"""
+        if self._lista_view is None:
+            self._set_view(self._lista_view_factory())
+        return self._lista_view
     
     def handle_event(self, action: str, *args):
         """Dispatcher de eventos da tela de itens"""
-        print(f"📋 ListaController evento: {action}")  # DEBUG
+        log.debug("📋 ListaController evento: %s", action)
         handlers = {
             'load_itens': self.load_itens,
             'add_item': self.add_item,
             'filter_itens': self.filter_itens,
+            'suggest_itens': self.suggest_itens,
+            'load_more_itens': self.load_more_itens,
             'toggle_item': self.toggle_item,
             'confirm_delete_item': self.confirm_delete_item,
+            'import_texto': self.import_texto,
+            'import_arquivo': self.import_arquivo,
             'go_home': self.go_home
         }
         if action in handlers:
@@ -27,11 +69,13 @@ class ListaController:
     
     def show_lista(self, lista_id: int):
         """Carrega itens da lista específica"""
-        print(f"📋 ListaController: Carregando lista {lista_id}")  # DEBUG
+        log.debug("📋 ListaController: Carregando lista %s", lista_id)
         self.lista_view.show_lista(lista_id)
         self.lista_view.lista_id = lista_id  # ✅ ARMAZENA ID ATUAL
         self.lista_view.sm.current = 'lista'  # ✅ ATIVA TELA
         self.load_itens(lista_id)  # ✅ CARREGA ITENS
+        if not self._sugestoes.carregado:
+            self._carregar_sugestoes()
     
     def load_itens(self, lista_id: int):
         """Carrega todos itens da lista"""
@@ -41,32 +85,158 @@ class ListaController:
         """Filtra itens por nome"""
         self._refresh_itens(lista_id, filtro)
     
+    def _async(self, executar: Callable, func: Callable, callback: Callable):
+        """Roda func(db) fora da UI (adb.read/adb.write) com indicador de carregamento"""
+        self.lista_view.set_loading(True)
+        
+        def ok(resultado):
+            self.lista_view.set_loading(False)
+            callback(resultado)
+        
+        def erro(e: Exception):
+            self.lista_view.set_loading(False)
+            log.error("❌ Erro no banco: %s", e)
+        
+        return executar(func, ok, erro)
+    
     def _refresh_itens(self, lista_id: int, filtro: str):
         """Atualiza view com itens filtrados"""
-        itens = db.get_itens(lista_id, filtro)
-        total = db.get_total_comprados(lista_id)
-        self.lista_view.update_itens(itens, total)
+        self._geracao += 1
+        geracao = self._geracao
+        self._filtro = filtro
+        self._fim = True
+        self._paginando = False
+        ler = self._leitura()
+        if not filtro:
+            # ✅ Sem filtro: só a primeira página; o resto vem ao rolar
+            def primeira(resultado):
+                itens, total = resultado
+                if geracao == self._geracao:
+                    self._avancar(itens)
+                    self.lista_view.update_itens(itens, total)
+            
+            self._async(
+                ler,
+                lambda d: (d.get_itens_page(lista_id, 0, PAGINA), d.get_total_comprados(lista_id)),
+                primeira
+            )
+            return
+        itens = self._busca.buscar(lista_id, filtro)
+        if itens is not None:
+            # ✅ Refinado em memória: atualiza no mesmo frame, sem ir ao banco
+            self.lista_view.update_itens(itens, self._busca.extra)
+            return
+        versao = self._busca.versao
+        
+        def consultar(d):
+            itens = d.get_itens(lista_id, filtro)
+            return itens, d.get_total_comprados(lista_id), SearchCache.preparar(itens), d.fts_enabled
+        
+        def pronto(resultado):
+            itens, total, dobrados, prefixo = resultado
+            self._busca.guardar(lista_id, filtro, itens, dobrados, prefixo, versao, extra=total)
+            if geracao == self._geracao:
+                self.lista_view.update_itens(itens, total)
+        
+        self._async(ler, consultar, pronto)
+    
+    def load_more_itens(self, lista_id: int):
+        """Próxima página quando a rolagem chega perto do fim"""
+        if self._fim or self._paginando:
+            return
+        self._paginando = True
+        geracao = self._geracao
+        cursor = self._cursor
+        
+        def pronto(itens):
+            if geracao == self._geracao:
+                self._paginando = False
+                self._avancar(itens)
+                self.lista_view.append_itens(itens)
+        
+        self._async(adb.read, lambda d: d.get_itens_page(lista_id, cursor, PAGINA), pronto)
+    
+    def _avancar(self, pagina: List):
+        """Move o cursor para o fim da página recebida"""
+        self._fim = len(pagina) < PAGINA
+        if pagina:
+            self._cursor = pagina[-1][0]
+    
+    def _leitura(self) -> Callable:
+        """adb.read; com marcações por gravar, lê na fila de escrita (depois delas)"""
+        self._marcacoes.flush()
+        return adb.write if self._marcacoes.gravando else adb.read
+    
+    def flush(self, esperar: Optional[float] = None):
+        """Grava já as marcações pendentes (troca de tela, on_pause, on_stop);
+        com `esperar`, bloqueia até o banco confirmar (no máximo esperar s)"""
+        self._marcacoes.flush(esperar)
     
     def add_item(self, lista_id: int, nome: str, qtd: float, preco: float):
-        """✅ CORRIGIDO - Adiciona e atualiza tela"""
-        print(f"💾 Salvando item na lista {lista_id}: {nome}")
-        db.create_item(lista_id, nome, qtd, preco)
-        # ✅ CHAMA ATUALIZAÇÃO IMEDIATA
-        self._refresh_itens(lista_id, "")
+        """✅ CORRIGIDO - Adiciona e insere só a nova linha"""
+        log.debug("💾 Salvando item na lista %s: %s", lista_id, nome)
+        self._busca.invalidar()
+        self._marcacoes.flush()  # mantém a ordem das escritas
+        
+        def pronto(resultado):
+            item, total, prefixo = resultado
+            self._registrar_sugestao(item)
+            # Só entra na tela se casar com o filtro ativo; sem filtro, se não
+            # houver mais páginas (senão chega com a última página)
+            if self._fim and (not self._filtro or casa(item.nome, self._filtro, prefixo)):
+                self.lista_view.insert_item(item)
+            self.lista_view.update_total(total)
+        
+        self._async(
+            adb.write,
+            lambda d: (d.get_item(d.create_item(lista_id, nome, qtd, preco)),
+                       d.get_total_comprados(lista_id), d.fts_enabled),
+            pronto
+        )
     
     def toggle_item(self, item_id: int, comprado: bool):
-        """Marca/desmarca item como comprado"""
-        db.toggle_item(item_id, comprado)
-        # Recarrega lista atual se estiver aberta
-        if self.lista_view.lista_id:
-            self._refresh_itens(self.lista_view.lista_id, "")
+        """Marca/desmarca na hora (linha e total); o banco recebe em lote depois"""
+        dados = self.lista_view.item_data(item_id)
+        if dados is None:
+            return
+        self._busca.invalidar()
+        self._marcacoes.toggle(item_id, dados['comprado'], comprado)
+        if dados['comprado'] != comprado:
+            valor = dados['subtotal']
+            self.lista_view.update_total(self.lista_view.total + (valor if comprado else -valor))
+        self.lista_view.update_item(
+            Item(item_id, dados['nome'], dados['qtd'], dados['preco'], int(comprado), dados['subtotal'])
+        )
+    
+    def _on_marcacoes_gravadas(self, lista_ids: List[int]):
+        """Lote gravado: troca o total estimado pelo do banco (lista_totais)"""
+        lista_id = self._lista_view and self._lista_view.lista_id
+        if lista_id not in lista_ids or self._marcacoes.pending():
+            return
+        
+        def pronto(total):
+            if self.lista_view.lista_id == lista_id and not self._marcacoes.pending():
+                self.lista_view.update_total(total)
+        
+        adb.read(lambda d: d.get_total_comprados(lista_id), pronto)
     
     def confirm_delete_item(self, item_id: int):
         """Confirma exclusão de item"""
         def on_confirm(dialog):
-            db.delete_item(item_id)
-            if self.lista_view.lista_id:
-                self._refresh_itens(self.lista_view.lista_id, "")
+            lista_id = self.lista_view.lista_id
+            self._busca.invalidar()
+            self._marcacoes.flush()
+            
+            def excluir(d):
+                d.delete_item(item_id)
+                return d.get_total_comprados(lista_id) if lista_id else 0.0
+            
+            def pronto(total):
+                if lista_id and self.lista_view.lista_id == lista_id:
+                    self.lista_view.remove_item(item_id)
+                    self.lista_view.update_total(total)
+            
+            self._async(adb.write, excluir, pronto)
             dialog.dismiss()
         
         self.lista_view.show_confirm_dialog(
@@ -75,6 +245,77 @@ class ListaController:
             on_confirm
         )
     
+    def import_texto(self, lista_id: int, texto: str):
+        """Importa itens colados (uma linha por item)"""
+        self._importar(lista_id, lambda: io.StringIO(texto))
+    
+    def import_arquivo(self, lista_id: int):
+        """Importa itens de um arquivo CSV escolhido pelo usuário"""
+        caminho = self._choose_file()
+        if caminho:
+            self._importar(lista_id, lambda: open(caminho, newline='', encoding='utf-8-sig'))
+    
+    def _importar(self, lista_id: int, abrir: Callable[[], IO[str]]):
+        """Parse em streaming + executemany numa transação; UMA atualização no fim"""
+        erros = []
+        self._busca.invalidar()
+        self._marcacoes.flush()
+        
+        def importar(d):
+            with abrir() as linhas:
+                return d.create_itens(lista_id, parse_itens(linhas, erros))
+        
+        def pronto(importados: int):
+            if importados:
+                self._carregar_sugestoes()  # nomes novos no histórico
+            if self.lista_view.lista_id == lista_id:
+                self._refresh_itens(lista_id, "")
+            self.lista_view.show_import_result(importados, erros)
+        
+        self._async(adb.write, importar, pronto)
+    
+    # ===== AUTOCOMPLETE =====
+    def suggest_itens(self, texto: str):
+        """Sugestões para o nome digitado; consulta em memória, no mesmo frame"""
+        self.lista_view.show_sugestoes(self._sugestoes.sugerir(texto))
+    
+    def _carregar_sugestoes(self):
+        """Monta o índice na thread do banco e troca pelo atual quando pronto"""
+        if self._novos_itens is not None:
+            return  # já carregando
+        self._novos_itens = []
+        
+        def montar(d):
+            indice = ItemAutocomplete(self._sugestoes.limite)
+            indice.carregar(d.iter_historico_itens())
+            return indice
+        
+        def pronto(indice: ItemAutocomplete):
+            for item in self._novos_itens:
+                indice.registrar(item.nome, item.quantidade, item.preco_unit, item.id)
+            self._sugestoes, self._novos_itens = indice, None
+        
+        def erro(e: Exception):
+            self._novos_itens = None
+            log.error("❌ Erro ao carregar histórico de itens: %s", e)
+        
+        adb.read(montar, pronto, erro)
+    
+    def _registrar_sugestao(self, item: Item):
+        self._sugestoes.registrar(item.nome, item.quantidade, item.preco_unit, item.id)
+        if self._novos_itens is not None:
+            self._novos_itens.append(item)
+    
+    def _choose_file(self) -> str:
+        """Escolha de arquivo CSV (vazio se cancelado/indisponível)"""
+        try:
+            from plyer import filechooser
+            result = filechooser.open_file(filters=[["CSV", "*.csv", "*.txt"]])
+            return result[0] if result else ""
+        except:
+            return ""
+    
     def go_home(self):
         """Volta para tela inicial"""
+        self.flush()
         self.home_view.sm.current = 'home'
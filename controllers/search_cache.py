@@ -0,0 +1,118 @@
+"""
+BUSCA - Cache incremental de resultados (busca enquanto digita)
+Sem Kivy/Views. Guarda os resultados recentes de UMA chave (a tela de
+listas ou a lista aberta); quando o novo filtro estende um já consultado
+("arr" -> "arro"), refina aquele resultado em memória em vez de ir ao banco.
+
+O casamento espelha Database.search_*: com FTS5 cada termo é prefixo de
+alguma palavra do nome; sem FTS, substring do nome (ambos sem acento).
+Refinar mantém a ordem do resultado base (não reordena por relevância).
+"""
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from models.database import _fold
+
+Dobrado = Tuple[str, str]  # (nome sem acento, " palavra palavra ...")
+
+
+def _dobrar(texto: str) -> Dobrado:
+    nome = _fold(texto)
+    return nome, "".join(" " + palavra for palavra in re.findall(r"\w+", nome))
+
+
+def casa(nome: str, filtro: str, prefixo: bool) -> bool:
+    """Mesmo critério de Database.search_* para um nome avulso (ex.: item novo)"""
+    consulta, palavras = _dobrar(filtro)
+    if not (prefixo and palavras):
+        return consulta in _fold(nome)
+    dobrado = _dobrar(nome)[1]
+    return all(" " + termo in dobrado for termo in palavras.split(" ")[1:])
+
+
+class SearchCache:
+    """Resultados por filtro de uma chave; invalidar a cada escrita"""
+
+    def __init__(self, max_filtros: int = 16):
+        self.max_filtros = max_filtros
+        self.chave: Optional[Hashable] = None
+        self.prefixo = True      # FTS5 ativo no banco
+        self.extra: Any = None   # dado da chave que acompanha os resultados (ex.: total)
+        self.versao = 0          # muda a cada invalidação (descarta consultas em voo)
+        self.hits = self.misses = 0
+        self._dobrados: Dict[int, Dobrado] = {}
+        self._resultados: 'OrderedDict[str, List[Sequence]]' = OrderedDict()
+
+    @staticmethod
+    def preparar(linhas: List[Sequence]) -> Dict[int, Dobrado]:
+        """id -> nome dobrado; rodar na thread do banco junto com a consulta"""
+        return {linha[0]: _dobrar(linha[1]) for linha in linhas}
+
+    def guardar(self, chave: Hashable, filtro: str, linhas: List[Sequence],
+                dobrados: Dict[int, Dobrado], prefixo: bool, versao: int, extra: Any = None) -> None:
+        """Registra o resultado de uma consulta feita na versão `versao`"""
+        if versao != self.versao:
+            return  # houve escrita depois que a consulta saiu
+        if chave != self.chave:
+            self._limpar()
+            self.chave = chave
+        self.prefixo = prefixo
+        self.extra = extra
+        self._dobrados.update(dobrados)
+        self._lembrar(filtro, linhas)
+
+    def buscar(self, chave: Hashable, filtro: str) -> Optional[List[Sequence]]:
+        """Resultado em memória para o filtro ou None (ir ao banco)"""
+        if chave != self.chave:
+            self.misses += 1
+            return None
+        # Só refina a partir de base com o mesmo critério: "%" (sem termos)
+        # casou por substring, mas "%a" vai ao banco como prefixo de "a"
+        modo = self._por_prefixo(filtro)
+        base = max((f for f in self._resultados
+                    if filtro.startswith(f) and self._por_prefixo(f) == modo), key=len, default=None)
+        if base is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if base == filtro:
+            self._resultados.move_to_end(filtro)
+            return self._resultados[filtro]
+        linhas = self._refinar(self._resultados[base], filtro)
+        self._lembrar(filtro, linhas)
+        return linhas
+
+    def invalidar(self) -> None:
+        """A chave mudou no banco (criação, exclusão, marcação...)"""
+        self.versao += 1
+        self._limpar()
+
+    def _por_prefixo(self, filtro: str) -> bool:
+        """True se o filtro casa por prefixo de palavra (FTS com termos)"""
+        return self.prefixo and bool(_dobrar(filtro)[1])
+
+    def _refinar(self, linhas: List[Sequence], filtro: str) -> List[Sequence]:
+        """Linhas (já casadas por um filtro mais curto, mesmo critério) que casam com filtro"""
+        dobrados = self._dobrados
+        consulta, palavras = _dobrar(filtro)
+        if not (self.prefixo and palavras):
+            return [linha for linha in linhas if consulta in dobrados[linha[0]][0]]
+        # " termo" dentro de " palavra palavra" == termo é prefixo de alguma palavra
+        termos = [" " + termo for termo in palavras.split(" ")[1:]]
+        if len(termos) == 1:
+            termo = termos[0]
+            return [linha for linha in linhas if termo in dobrados[linha[0]][1]]
+        return [linha for linha in linhas if all(t in dobrados[linha[0]][1] for t in termos)]
+
+    def _lembrar(self, filtro: str, linhas: List[Sequence]) -> None:
+        self._resultados[filtro] = linhas
+        self._resultados.move_to_end(filtro)
+        while len(self._resultados) > self.max_filtros:
+            self._resultados.popitem(last=False)
+
+    def _limpar(self) -> None:
+        self.chave = None
+        self.extra = None
+        self._dobrados.clear()
+        self._resultados.clear()
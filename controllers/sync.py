@@ -0,0 +1,74 @@
+"""
+SINCRONIZAÇÃO - Listas compartilhadas entre aparelhos (delta)
+Sem Kivy. Cada linha alterada vira um registro de sync_changelog com os
+campos mudados em JSON (triggers da migração v7, com uid global, carimbo e
+origem); aqui só as mudanças desde o último cursor vão e vêm, em lotes
+comprimidos, por um transporte plugável (controllers/sync_transport.py). Tráfego e tempo crescem com o número de
+mudanças, não com o tamanho do banco.
+
+Conflitos: por campo vence o maior carimbo (relógio híbrido, ver
+migrations._SYNC_CARIMBO) e, no empate, a maior origem; exclusão vence
+edição concorrente.
+"""
+from typing import Dict
+
+from controllers.sync_transport import codificar, decodificar
+from models.database import Database
+from utils.log import get_logger
+
+log = get_logger('sync')
+
+CURSOR_ENVIO = 'cursor_envio'                # último seq local enviado
+CURSOR_RECEBIMENTO = 'cursor_recebimento'    # posição no log do servidor
+
+
+class SyncEngine:
+    """push + pull de um Database por um transporte"""
+
+    def __init__(self, database: Database, transport, lote: int = 500):
+        self.database = database
+        self.transport = transport
+        self.lote = lote
+
+    @property
+    def origem(self) -> str:
+        return self.database.get_sync_state('origem')
+
+    def sync(self) -> Dict[str, int]:
+        """Envia as mudanças locais e aplica as remotas; retorna contadores"""
+        stats = {'enviadas': 0, 'recebidas': 0, 'aplicadas': 0}
+        self.push(stats)
+        self.pull(stats)
+        log.info("🔄 Sincronizado: %(enviadas)d enviadas, %(recebidas)d recebidas, "
+                 "%(aplicadas)d linhas alteradas", stats)
+        return stats
+
+    def push(self, stats: Dict[str, int]) -> None:
+        origem = self.origem
+        cursor = self.database.get_sync_state(CURSOR_ENVIO, 0)
+        while True:
+            lote = self.database.get_sync_changes(cursor, self.lote)
+            if not lote:
+                return
+            self.transport.push(codificar({'origem': origem, 'mudancas': [m[1:] for m in lote]}))
+            # Só avança depois do servidor aceitar (reenvio é deduplicado lá)
+            cursor = lote[-1][0]
+            self.database.set_sync_state(CURSOR_ENVIO, cursor)
+            stats['enviadas'] += len(lote)
+            if len(lote) < self.lote:
+                return
+
+    def pull(self, stats: Dict[str, int]) -> None:
+        origem = self.origem
+        cursor = self.database.get_sync_state(CURSOR_RECEBIMENTO, 0)
+        while True:
+            resposta = decodificar(self.transport.pull(origem, cursor, self.lote))
+            if resposta['cursor'] != cursor:
+                # Mudanças e cursor na mesma transação: falha no meio não pula nada
+                stats['aplicadas'] += self.database.apply_sync_changes(
+                    resposta['mudancas'], {CURSOR_RECEBIMENTO: resposta['cursor']}
+                )
+                stats['recebidas'] += len(resposta['mudancas'])
+                cursor = resposta['cursor']
+            if not resposta['mais']:
+                return
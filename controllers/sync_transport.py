@@ -0,0 +1,154 @@
+"""
+SINCRONIZAÇÃO - Transportes e servidor de referência
+Sem Kivy. Um transporte é qualquer objeto com:
+    push(payload: bytes) -> None
+    pull(origem: str, cursor: int, limite: int) -> bytes
+Os payloads são JSON comprimido (codificar/decodificar). O SyncServer
+guarda o log de mudanças de todos os aparelhos em memória; serve direto
+no processo (LocalTransport) ou por HTTP na rede local (HttpTransport).
+
+Servidor avulso: python -m controllers.sync_transport --porta 8765
+"""
+import argparse
+import json
+import threading
+import urllib.parse
+import urllib.request
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, List, Set, Tuple
+
+from utils.log import get_logger
+
+log = get_logger('sync')
+
+
+def codificar(obj: Any) -> bytes:
+    return zlib.compress(json.dumps(obj, separators=(',', ':')).encode(), 6)
+
+
+def decodificar(payload: bytes) -> Any:
+    return json.loads(zlib.decompress(payload))
+
+
+class SyncServer:
+    """Log append-only das mudanças recebidas; cursor = posição no log"""
+
+    def __init__(self):
+        self._log: List[list] = []  # [tabela, uid, {campo: valor}, carimbo, origem]
+        self._vistos: Set[Tuple] = set()  # reenvio após falha não duplica
+        self._lock = threading.Lock()
+
+    def push(self, payload: bytes) -> None:
+        lote = decodificar(payload)
+        origem = lote['origem']
+        with self._lock:
+            for tabela, uid, campos, carimbo in lote['mudancas']:
+                chave = (origem, carimbo, tabela, uid)
+                if chave not in self._vistos:
+                    self._vistos.add(chave)
+                    self._log.append([tabela, uid, campos, carimbo, origem])
+
+    def pull(self, origem: str, cursor: int, limite: int) -> bytes:
+        """Até `limite` mudanças de OUTROS aparelhos a partir do cursor"""
+        mudancas = []
+        with self._lock:
+            posicao = cursor
+            while posicao < len(self._log) and len(mudancas) < limite:
+                if self._log[posicao][4] != origem:
+                    mudancas.append(self._log[posicao])
+                posicao += 1
+            mais = posicao < len(self._log)
+        return codificar({'cursor': posicao, 'mais': mais, 'mudancas': mudancas})
+
+    def __len__(self) -> int:
+        return len(self._log)
+
+
+class LocalTransport:
+    """Servidor no mesmo processo (testes, benchmark); conta os bytes trafegados"""
+
+    def __init__(self, servidor: SyncServer):
+        self.servidor = servidor
+        self.bytes_enviados = self.bytes_recebidos = 0
+
+    def push(self, payload: bytes) -> None:
+        self.bytes_enviados += len(payload)
+        self.servidor.push(payload)
+
+    def pull(self, origem: str, cursor: int, limite: int) -> bytes:
+        payload = self.servidor.pull(origem, cursor, limite)
+        self.bytes_recebidos += len(payload)
+        return payload
+
+
+class HttpTransport:
+    """POST {url}/push e GET {url}/pull?origem=&cursor=&limite="""
+
+    def __init__(self, url: str, timeout: float = 30.0):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def push(self, payload: bytes) -> None:
+        requisicao = urllib.request.Request(
+            f"{self.url}/push", data=payload, method='POST',
+            headers={'Content-Type': 'application/octet-stream'}
+        )
+        with urllib.request.urlopen(requisicao, timeout=self.timeout) as resposta:
+            resposta.read()
+
+    def pull(self, origem: str, cursor: int, limite: int) -> bytes:
+        query = urllib.parse.urlencode({'origem': origem, 'cursor': cursor, 'limite': limite})
+        with urllib.request.urlopen(f"{self.url}/pull?{query}", timeout=self.timeout) as resposta:
+            return resposta.read()
+
+
+def serve_http(servidor: SyncServer, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """Sobe o SyncServer por HTTP numa thread daemon (port=0: porta livre)"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != '/push':
+                self.send_error(404)
+                return
+            servidor.push(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            self._responder(b'')
+
+        def do_GET(self):
+            url = urllib.parse.urlparse(self.path)
+            if url.path != '/pull':
+                self.send_error(404)
+                return
+            query = urllib.parse.parse_qs(url.query)
+            self._responder(servidor.pull(query['origem'][0], int(query['cursor'][0]), int(query['limite'][0])))
+
+        def _responder(self, corpo: bytes):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, formato, *args):
+            log.debug("🌐 " + formato, *args)
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=httpd.serve_forever, name='sync-http', daemon=True).start()
+    log.info("🌐 Servidor de sincronização em http://%s:%d", *httpd.server_address[:2])
+    return httpd
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de sincronização (em memória)")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--porta', type=int, default=8765)
+    args = parser.parse_args()
+    httpd = serve_http(SyncServer(), args.host, args.porta)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        httpd.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+WRITE-BEHIND - Marcações de itens gravadas em lote
+Sem Kivy/Views. O controller aplica a marcação na view na hora e registra
+aqui; marcações repetidas do mesmo item se fundem (voltar ao estado
+original cancela) e o lote vai ao banco numa única transação após
+`atraso` segundos, ou antes, via flush() (troca de tela, on_pause, on_stop).
+"""
+import threading
+from concurrent.futures import Future, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.log import get_logger
+
+log = get_logger('write_behind')
+
+
+class WriteBehind:
+    """Buffer item_id -> comprado sobre um AsyncDatabase"""
+
+    def __init__(self, async_db, atraso: float = 0.8,
+                 on_flushed: Optional[Callable[[List[int]], None]] = None):
+        self.async_db = async_db
+        self.atraso = atraso
+        self.on_flushed = on_flushed  # recebe as listas afetadas (no dispatcher)
+        self._lock = threading.Lock()
+        self._pendentes: Dict[int, Tuple[bool, bool]] = {}  # item -> (original, novo)
+        self._timer: Optional[threading.Timer] = None
+        self._em_voo: Optional[Future] = None
+
+    def toggle(self, item_id: int, original: bool, comprado: bool) -> None:
+        """Registra a marcação; `original` é o estado antes dela (na view)"""
+        with self._lock:
+            anterior = self._pendentes.get(item_id)
+            if anterior:
+                original = anterior[0]
+            if comprado == original:
+                self._pendentes.pop(item_id, None)  # ida e volta: nada a gravar
+            else:
+                self._pendentes[item_id] = (original, comprado)
+            if self._pendentes and self._timer is None:
+                # Não reinicia a cada marcação: grava no máximo `atraso` depois da primeira
+                self._timer = threading.Timer(self.atraso, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pendentes)
+    
+    @property
+    def gravando(self) -> bool:
+        """Há lote pendente ou ainda não confirmado pelo banco"""
+        return self.pending() > 0 or (self._em_voo is not None and not self._em_voo.done())
+
+    def flush(self, esperar: Optional[float] = None) -> Optional[Future]:
+        """Envia o lote para a thread escritora (None se não havia nada).
+        Com `esperar` (segundos), só volta quando o banco confirmar este lote
+        e o anterior, ou o prazo acabar (on_pause: o processo pode morrer logo)"""
+        anterior = self._em_voo
+        futuro = self._enviar()
+        if esperar is not None:
+            pendentes = [f for f in (anterior, futuro) if f is not None]
+            _, nao_gravados = wait(pendentes, timeout=esperar)
+            if nao_gravados:
+                log.warning("⚠️ Marcações ainda não gravadas após %.1f s", esperar)
+        return futuro
+
+    def _enviar(self) -> Optional[Future]:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            lote, self._pendentes = self._pendentes, {}
+        if not lote:
+            return None
+        mudancas = [(item_id, comprado) for item_id, (_, comprado) in lote.items()]
+
+        def erro(e: Exception):
+            # Devolve ao buffer (sem sobrescrever marcações mais novas) para o próximo flush
+            log.error("❌ Erro ao gravar %d marcações: %s", len(lote), e)
+            with self._lock:
+                for item_id, estado in lote.items():
+                    self._pendentes.setdefault(item_id, estado)
+
+        log.debug("💾 Gravando %d marcações", len(mudancas))
+        self._em_voo = self.async_db.write(lambda d: d.toggle_itens(mudancas), self.on_flushed, erro)
+        return self._em_voo
@@ -0,0 +1,75 @@
+"""
+MODELO - Acesso assíncrono ao banco (MVC)
+Tira as consultas da thread principal do Kivy:
+1 thread escritora (escritas em ordem) + threads leitoras sobre o mesmo Database
+(que já abre uma conexão de leitura por thread e serializa as escritas)
+Resultados voltam como Future e, opcionalmente, via callback no dispatcher (Clock)
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from models.database import Database, db
+from utils.log import get_logger
+
+log = get_logger('db')
+
+
+def _call_direct(func: Callable[[], None]) -> None:
+    """Dispatcher padrão (sem Kivy): executa na própria thread do banco"""
+    func()
+
+
+class AsyncDatabase:
+    """Executa funções Database -> resultado fora da thread de UI"""
+
+    def __init__(self, database: Database, readers: int = 2,
+                 dispatcher: Callable[[Callable[[], None]], None] = _call_direct):
+        self.database = database
+        self.dispatcher = dispatcher
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-writer')
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix='db-reader')
+
+    def _run(self, func: Callable[[Database], Any]) -> Any:
+        return func(self.database)
+
+    def _submit(self, executor: ThreadPoolExecutor, func: Callable[[Database], Any],
+                callback: Optional[Callable[[Any], None]],
+                errback: Optional[Callable[[Exception], None]]) -> Future:
+        future = executor.submit(self._run, func)
+
+        def on_done(f: Future):
+            if f.cancelled():
+                return
+            erro = f.exception()
+            if erro is not None:
+                if errback:
+                    self.dispatcher(lambda: errback(erro))
+                else:
+                    log.error("❌ Erro no banco: %s", erro)
+            elif callback:
+                resultado = f.result()
+                self.dispatcher(lambda: callback(resultado))
+
+        future.add_done_callback(on_done)
+        return future
+
+    def read(self, func: Callable[[Database], Any],
+             callback: Optional[Callable[[Any], None]] = None,
+             errback: Optional[Callable[[Exception], None]] = None) -> Future:
+        """Consulta em uma thread leitora (podem rodar em paralelo)"""
+        return self._submit(self._readers, func, callback, errback)
+
+    def write(self, func: Callable[[Database], Any],
+              callback: Optional[Callable[[Any], None]] = None,
+              errback: Optional[Callable[[Exception], None]] = None) -> Future:
+        """Escrita na thread escritora (serializadas na ordem de envio)"""
+        return self._submit(self._writer, func, callback, errback)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Encerra as threads (chamar no on_stop do app)"""
+        self._writer.shutdown(wait=wait)
+        self._readers.shutdown(wait=wait)
+
+
+# Instância global sobre o singleton síncrono
+adb = AsyncDatabase(db)
@@ -3,115 +3,624 @@ MODELO - Camada de Dados (MVC)
 Responsável apenas por CRUD e banco SQLite
 Sem UI, sem lógica de negócio
 """
+import functools
+import json
+import re
 import sqlite3
-from typing import List, Tuple, Optional
+import threading
+import unicodedata
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Sequence, Tuple, Optional
+
+from models import migrations
+from models.rows import Item, ItemExportado, Lista, row_factory
+
+
+# Ajustes de desempenho aplicados a cada conexão
+PRAGMAS = {
+    'journal_mode': 'WAL',      # leitores não bloqueiam o escritor
+    'synchronous': 'NORMAL',    # seguro com WAL, evita fsync a cada commit
+    'cache_size': -8000,        # ~8 MB de cache de páginas
+    'mmap_size': 67108864,      # 64 MB mapeados em memória
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON',       # itens.lista_id ON DELETE CASCADE (v6)
+}
+
+
+def _fold(texto: Optional[str]) -> str:
+    """Minúsculas sem acentos ("Feijão" -> "feijao")"""
+    if not texto:
+        return ""
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+
+def _fts_query(filtro: str) -> str:
+    """Converte texto livre em consulta FTS5: cada termo vira prefixo ("arr"*)"""
+    termos = re.findall(r"\w+", filtro)
+    return " ".join(f'"{termo}"*' for termo in termos)
+
+
+def _like_pattern(filtro: str) -> str:
+    """Substring sem acento para LIKE ... ESCAPE '\\' ("50%" é literal)"""
+    escapado = _fold(filtro).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escapado}%'
+
+
+# Colunas de Item (models/rows.py); subtotal calculado uma vez, na consulta
+_ITEM_COLUNAS = "id, nome, quantidade, preco_unit, comprado, quantidade * preco_unit"
+
+
+def _cacheado(tabela: str, por_lista: bool = False, agregado: bool = False) -> Callable:
+    """Leitura servida pelo cache LRU do Database (se ligado).
+    A entrada vale enquanto as gerações de que depende não mudarem:
+    global ('*'), da tabela e, se por_lista, da tabela naquela lista (1º argumento);
+    se agregado, de qualquer lista da tabela"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if self._cache is None or kwargs:
+                return func(self, *args, **kwargs)
+            chave = (func.__name__,) + args
+            try:
+                hash(chave)
+            except TypeError:  # argumento lista/dict: sem cache
+                return func(self, *args)
+            dependencias = ('*', tabela)
+            if por_lista:
+                dependencias += ((tabela, args[0]),)
+            if agregado:
+                dependencias += ((tabela, None),)
+            return self._cache_get(chave, dependencias, lambda: func(self, *args))
+        return wrapper
+    return decorator
 
 
 class Database:
-    """Gerenciador completo do banco SQLite"""
+    """Gerenciador completo do banco SQLite.
+    Thread-safe: uma conexão escritora (escritas serializadas por lock)
+    e uma conexão de leitura por thread, abertas sob demanda.
+    cache_size > 0 liga um cache LRU de leituras (ver _cacheado); os
+    resultados em cache são compartilhados, não devem ser modificados"""
     
-    def __init__(self, db_path: str = 'compras.db'):
+    def __init__(self, db_path: str = 'compras.db', auto_migrate: bool = True,
+                 busy_timeout: float = 5.0, cache_size: int = 0):
         self.db_path = db_path
-        self._conn = sqlite3.connect(db_path)
-        self._create_tables()
-    
-    def _create_tables(self) -> None:
-        """Cria estrutura do banco se não existir"""
-        with self._conn:
-            self._conn.execute('''CREATE TABLE IF NOT EXISTS listas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nome TEXT NOT NULL
-            )''')
-            self._conn.execute('''CREATE TABLE IF NOT EXISTS itens (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                lista_id INTEGER,
-                nome TEXT,
-                quantidade REAL,
-                preco_unit REAL,
-                comprado INTEGER DEFAULT 0,
-                FOREIGN KEY(lista_id) REFERENCES listas(id)
-            )''')
+        self.busy_timeout = busy_timeout
+        self.fts_enabled = False
+        self._cascata = False  # schema v6: excluir a lista já exclui os itens
+        self._memory = db_path == ':memory:'
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._closed = False
+        self.cache_size = cache_size
+        self._cache: Optional[OrderedDict] = OrderedDict() if cache_size > 0 else None
+        self._cache_lock = threading.Lock()
+        self._geracoes: Dict[Hashable, int] = defaultdict(int)
+        self._cache_hits = self._cache_misses = 0
+        self._conn = self._connect()  # conexão escritora
+        if auto_migrate:
+            self.migrate()
+    
+    def _connect(self, somente_leitura: bool = False) -> sqlite3.Connection:
+        """Nova conexão com pragmas, busy timeout e função fold()"""
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, check_same_thread=False)
+        conn.create_function('fold', 1, _fold, deterministic=True)
+        for nome, valor in PRAGMAS.items():
+            if nome == 'journal_mode' and self._memory:
+                continue
+            conn.execute(f"PRAGMA {nome} = {valor}")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}")
+        if somente_leitura:
+            conn.execute("PRAGMA query_only = 1")
+        return conn
+    
+    def _reader(self) -> sqlite3.Connection:
+        """Conexão de leitura da thread atual (WAL: não bloqueia o escritor).
+        Em :memory: cada conexão seria outro banco, então lê pela escritora"""
+        if self._memory:
+            return self._conn
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Database fechado")
+            conn = self._connect(somente_leitura=True)
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+    
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Transação na conexão escritora, uma thread por vez"""
+        with self._write_lock:
+            with self._conn:
+                yield self._conn
+    
+    # ===== CACHE DE LEITURAS =====
+    def _cache_get(self, chave: tuple, dependencias: Tuple[Hashable, ...], consultar: Callable):
+        with self._cache_lock:
+            entrada = self._cache.get(chave)
+            if entrada is not None and all(self._geracoes[d] == g for d, g in entrada[1]):
+                self._cache.move_to_end(chave)
+                self._cache_hits += 1
+                return entrada[0]
+            self._cache_misses += 1
+            # Gerações lidas ANTES da consulta: escrita concorrente invalida o resultado
+            geracoes = tuple((d, self._geracoes[d]) for d in dependencias)
+        valor = consultar()
+        with self._cache_lock:
+            self._cache[chave] = (valor, geracoes)
+            self._cache.move_to_end(chave)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return valor
+    
+    def _invalidar(self, *escopos: Hashable) -> None:
+        """Chamado APÓS o commit de cada escrita: 'listas', ('itens', lista_id)..."""
+        if self._cache is None:
+            return
+        with self._cache_lock:
+            for escopo in escopos:
+                self._geracoes[escopo] += 1
+                if isinstance(escopo, tuple):
+                    self._geracoes[(escopo[0], None)] += 1  # "alguma lista mudou"
+    
+    def invalidate_cache(self) -> None:
+        """Descarta tudo (para quem escreve direto via _write)"""
+        self._invalidar('*')
+    
+    def cache_stats(self) -> Dict[str, float]:
+        """Acertos/faltas do cache de leituras"""
+        with self._cache_lock:
+            total = self._cache_hits + self._cache_misses
+            return {
+                'hits': self._cache_hits, 'misses': self._cache_misses,
+                'hit_rate': self._cache_hits / total if total else 0.0,
+                'size': len(self._cache) if self._cache is not None else 0,
+            }
+    
+    def close(self) -> None:
+        """Fecha escritora e leitoras (chamar no on_stop do app)"""
+        self._closed = True
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            conn.close()
+        with self._write_lock:
+            self._conn.close()
+    
+    def migrate(self, target: Optional[int] = None) -> int:
+        """Atualiza o schema (até target, padrão: última versão) e retorna a versão"""
+        with self._write_lock:
+            versao = migrations.migrate(self._conn, target)
+            self.fts_enabled = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name='itens_fts'"
+            ).fetchone() is not None
+            self._cascata = versao >= 6
+        self.invalidate_cache()
+        return versao
+    
+    @property
+    def schema_version(self) -> int:
+        return migrations.get_version(self._reader())
     
     # ===== LISTAS =====
     def create_lista(self, nome: str) -> int:
         """Cria lista e retorna ID"""
-        with self._conn:
-            cursor = self._conn.cursor()
+        with self._write() as conn:
+            cursor = conn.cursor()
             cursor.execute("INSERT INTO listas (nome) VALUES (?)", (nome,))
-            return cursor.lastrowid
+        # o trigger cria a linha de lista_totais: vale para get_listas_stats/get_revisoes
+        self._invalidar('listas', ('itens', cursor.lastrowid))
+        return cursor.lastrowid
     
     def delete_lista(self, lista_id: int) -> None:
         """Remove lista e todos seus itens"""
-        with self._conn:
-            self._conn.execute("DELETE FROM itens WHERE lista_id=?", (lista_id,))
-            self._conn.execute("DELETE FROM listas WHERE id=?", (lista_id,))
-    
-    def get_listas(self, filtro: str = "") -> List[Tuple[int, str]]:
-        """Lista todas ou filtradas por nome"""
-        with self._conn:
-            cursor = self._conn.cursor()
-            if filtro:
-                cursor.execute(
-                    "SELECT id, nome FROM listas WHERE nome LIKE ? ORDER BY id DESC",
-                    (f'%{filtro}%',)
-                )
-            else:
-                cursor.execute("SELECT id, nome FROM listas ORDER BY id DESC")
-            return cursor.fetchall()
+        self.delete_listas([lista_id])
+    
+    def delete_listas(self, lista_ids: Iterable[int]) -> int:
+        """Remove várias listas (e seus itens) em UMA transação; retorna quantas existiam"""
+        lista_ids = list(lista_ids)
+        if not lista_ids:
+            return 0
+        ids_json = json.dumps(lista_ids)
+        with self._write() as conn:
+            if not self._cascata:  # schema antigo, sem ON DELETE CASCADE
+                conn.execute("DELETE FROM itens WHERE lista_id IN (SELECT value FROM json_each(?))", (ids_json,))
+            removidas = conn.execute(
+                "DELETE FROM listas WHERE id IN (SELECT value FROM json_each(?))", (ids_json,)
+            ).rowcount
+        self._invalidar('listas', *(('itens', lista_id) for lista_id in lista_ids))
+        return removidas
+    
+    @_cacheado('listas')
+    def get_listas(self, filtro: str = "") -> List[Lista]:
+        """Lista todas ou filtradas por nome (ordenadas por relevância)"""
+        if filtro:
+            return self.search_listas(filtro)
+        cursor = self._cursor(Lista)
+        cursor.execute("SELECT id, nome FROM listas ORDER BY id DESC")
+        return cursor.fetchall()
+    
+    def iter_listas(self, batch: int = 500) -> Iterator[Lista]:
+        """Todas as listas (id DESC) em streaming, sem cache nem lista intermediária"""
+        cursor = self._cursor(Lista)
+        cursor.execute("SELECT id, nome FROM listas ORDER BY id DESC")
+        yield from self._em_lotes(cursor, batch)
+    
+    @_cacheado('listas')
+    def get_listas_page(self, before_id: Optional[int] = None, limit: int = 100) -> List[Lista]:
+        """Página de listas (id DESC) após o cursor: id < before_id (keyset, sem OFFSET)"""
+        cursor = self._cursor(Lista)
+        if before_id is None:
+            cursor.execute("SELECT id, nome FROM listas ORDER BY id DESC LIMIT ?", (limit,))
+        else:
+            cursor.execute(
+                "SELECT id, nome FROM listas WHERE id < ? ORDER BY id DESC LIMIT ?", (before_id, limit)
+            )
+        return cursor.fetchall()
+    
+    @_cacheado('listas')
+    def search_listas(self, filtro: str) -> List[Lista]:
+        """Busca por prefixo e sem acento; FTS5 quando disponível, senão LIKE"""
+        cursor = self._cursor(Lista)
+        consulta = _fts_query(filtro)
+        if self.fts_enabled and consulta:
+            cursor.execute(
+                "SELECT l.id, l.nome FROM listas_fts f JOIN listas l ON l.id = f.rowid "
+                "WHERE listas_fts MATCH ? ORDER BY f.rank, l.id DESC", (consulta,)
+            )
+        else:
+            cursor.execute(
+                "SELECT id, nome FROM listas WHERE fold(nome) LIKE ? ESCAPE '\\' ORDER BY id DESC",
+                (_like_pattern(filtro),)
+            )
+        return cursor.fetchall()
     
+    @_cacheado('listas', por_lista=True)
     def get_lista_nome(self, lista_id: int) -> str:
         """Nome da lista por ID"""
-        cursor = self._conn.cursor()
+        cursor = self._reader().cursor()
         cursor.execute("SELECT nome FROM listas WHERE id=?", (lista_id,))
         result = cursor.fetchone()
         return result[0] if result else f"Lista {lista_id}"
     
+    def lista_exists(self, lista_id: int) -> bool:
+        cursor = self._reader().cursor()
+        cursor.execute("SELECT 1 FROM listas WHERE id=?", (lista_id,))
+        return cursor.fetchone() is not None
+    
     # ===== ITENS =====
-    def create_item(self, lista_id: int, nome: str, qtd: float, preco: float) -> None:
-        """Adiciona item à lista"""
-        with self._conn:
-            self._conn.execute(
+    def create_item(self, lista_id: int, nome: str, qtd: float, preco: float) -> int:
+        """Adiciona item à lista e retorna ID"""
+        with self._write() as conn:
+            cursor = conn.execute(
                 "INSERT INTO itens (lista_id, nome, quantidade, preco_unit) VALUES (?, ?, ?, ?)",
                 (lista_id, nome, qtd, preco)
             )
+        self._invalidar(('itens', lista_id))
+        return cursor.lastrowid
+    
+    def create_itens(self, lista_id: int, itens: Iterable[Tuple[str, float, float]]) -> int:
+        """Adiciona vários itens (nome, qtd, preço) em UMA transação; retorna quantos"""
+        with self._write() as conn:
+            cursor = conn.executemany(
+                "INSERT INTO itens (lista_id, nome, quantidade, preco_unit) VALUES (?, ?, ?, ?)",
+                ((lista_id, nome, qtd, preco) for nome, qtd, preco in itens)
+            )
+        self._invalidar(('itens', lista_id))
+        return cursor.rowcount
     
     def delete_item(self, item_id: int) -> None:
         """Remove item específico"""
-        with self._conn:
-            self._conn.execute("DELETE FROM itens WHERE id=?", (item_id,))
+        with self._write() as conn:
+            lista_id = self._lista_do_item(conn, item_id)
+            conn.execute("DELETE FROM itens WHERE id=?", (item_id,))
+        self._invalidar(('itens', lista_id))
     
     def toggle_item(self, item_id: int, comprado: bool) -> None:
         """Marca/desmarca como comprado"""
-        with self._conn:
-            self._conn.execute(
+        with self._write() as conn:
+            lista_id = self._lista_do_item(conn, item_id)
+            conn.execute(
                 "UPDATE itens SET comprado=? WHERE id=?", (int(comprado), item_id)
             )
+        self._invalidar(('itens', lista_id))
+    
+    def toggle_itens(self, mudancas: Iterable[Tuple[int, bool]]) -> List[int]:
+        """Várias marcações (item_id, comprado) em UMA transação; retorna as listas afetadas"""
+        mudancas = [(int(comprado), item_id) for item_id, comprado in mudancas]
+        with self._write() as conn:
+            conn.executemany("UPDATE itens SET comprado=? WHERE id=?", mudancas)
+            lista_ids = [row[0] for row in conn.execute(
+                "SELECT DISTINCT lista_id FROM itens WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps([item_id for _, item_id in mudancas]),)
+            )]
+        self._invalidar(*(('itens', lista_id) for lista_id in lista_ids))
+        return lista_ids
+    
+    def _lista_do_item(self, conn: sqlite3.Connection, item_id: int) -> Optional[int]:
+        """lista_id para invalidar o cache (só consulta se o cache estiver ligado)"""
+        if self._cache is None:
+            return None
+        row = conn.execute("SELECT lista_id FROM itens WHERE id=?", (item_id,)).fetchone()
+        return row[0] if row else None
     
-    def get_itens(self, lista_id: int, filtro: str = "") -> List[Tuple[int, str, float, float, int]]:
-        """Itens da lista com filtro opcional"""
-        cursor = self._conn.cursor()
+    def get_item(self, item_id: int) -> Optional[Item]:
+        """Item único por ID (mesmo formato das linhas de get_itens)"""
+        cursor = self._cursor(Item)
+        cursor.execute(f"SELECT {_ITEM_COLUNAS} FROM itens WHERE id=?", (item_id,))
+        return cursor.fetchone()
+    
+    @_cacheado('itens', por_lista=True)
+    def get_itens(self, lista_id: int, filtro: str = "") -> List[Item]:
+        """Itens da lista com filtro opcional (filtrados: por relevância)"""
         if filtro:
+            return self.search_itens(lista_id, filtro)
+        cursor = self._cursor(Item)
+        cursor.execute(f"SELECT {_ITEM_COLUNAS} FROM itens WHERE lista_id=? ORDER BY id", (lista_id,))
+        return cursor.fetchall()
+    
+    def iter_itens(self, lista_id: int, batch: int = 500) -> Iterator[Item]:
+        """Itens da lista (id ASC) em streaming, sem cache nem lista intermediária"""
+        cursor = self._cursor(Item)
+        cursor.execute(f"SELECT {_ITEM_COLUNAS} FROM itens WHERE lista_id=? ORDER BY id", (lista_id,))
+        yield from self._em_lotes(cursor, batch)
+    
+    @_cacheado('itens', por_lista=True)
+    def get_itens_page(self, lista_id: int, after_id: int = 0, limit: int = 100) -> List[Item]:
+        """Página de itens (id ASC) após o cursor: id > after_id (usa idx_itens_lista_id)"""
+        cursor = self._cursor(Item)
+        cursor.execute(
+            f"SELECT {_ITEM_COLUNAS} FROM itens WHERE lista_id=? AND id > ? ORDER BY id LIMIT ?",
+            (lista_id, after_id, limit)
+        )
+        return cursor.fetchall()
+    
+    @_cacheado('itens', por_lista=True)
+    def search_itens(self, lista_id: int, filtro: str) -> List[Item]:
+        """Busca itens da lista por prefixo e sem acento ("feijao" acha "Feijão")"""
+        cursor = self._cursor(Item)
+        consulta = _fts_query(filtro)
+        if self.fts_enabled and consulta:
             cursor.execute(
-                "SELECT id, nome, quantidade, preco_unit, comprado FROM itens "
-                "WHERE lista_id=? AND nome LIKE ? ORDER BY id",
-                (lista_id, f'%{filtro}%')
+                "SELECT i.id, i.nome, i.quantidade, i.preco_unit, i.comprado, i.quantidade * i.preco_unit "
+                "FROM itens_fts f JOIN itens i ON i.id = f.rowid "
+                "WHERE itens_fts MATCH ? AND i.lista_id=? ORDER BY f.rank, i.id",
+                (consulta, lista_id)
             )
         else:
             cursor.execute(
-                "SELECT id, nome, quantidade, preco_unit, comprado FROM itens "
-                "WHERE lista_id=? ORDER BY id", (lista_id,)
+                f"SELECT {_ITEM_COLUNAS} FROM itens WHERE lista_id=? AND fold(nome) LIKE ? ESCAPE '\\' "
+                "ORDER BY id",
+                (lista_id, _like_pattern(filtro))
             )
         return cursor.fetchall()
     
+    def iter_export_rows(self, lista_ids: List[int], batch: int = 500) -> Iterator[ItemExportado]:
+        """Itens (com o nome da lista) de várias listas em UMA consulta,
+        na ordem de lista_ids e por id do item (streaming)"""
+        cursor = self._cursor(ItemExportado)
+        cursor.execute("""
+            WITH sel(ordem, lista_id) AS (SELECT key, value FROM json_each(?))
+            SELECT l.id, l.nome, i.nome, i.quantidade, i.preco_unit, i.comprado,
+                   i.quantidade * i.preco_unit
+            FROM sel
+            JOIN listas l ON l.id = sel.lista_id
+            JOIN itens i ON i.lista_id = l.id
+            ORDER BY sel.ordem, i.id
+        """, (json.dumps([int(lista_id) for lista_id in lista_ids]),))
+        yield from self._em_lotes(cursor, batch)
+    
+    def _cursor(self, tipo: type) -> sqlite3.Cursor:
+        """Cursor de leitura cujas linhas já saem como `tipo` (models/rows.py)"""
+        cursor = self._reader().cursor()
+        cursor.row_factory = row_factory(tipo)
+        return cursor
+    
+    @staticmethod
+    def _em_lotes(cursor: sqlite3.Cursor, batch: int) -> Iterator:
+        while True:
+            rows = cursor.fetchmany(batch)
+            if not rows:
+                return
+            yield from rows
+    
     def get_total_comprados(self, lista_id: int) -> float:
-        """Calcula total apenas de itens comprados"""
-        cursor = self._conn.cursor()
+        """Total apenas de itens comprados (lido de lista_totais, O(1))"""
+        return self.get_totais(lista_id)[0]
+    
+    @_cacheado('itens', por_lista=True)
+    def get_totais(self, lista_id: int) -> Tuple[float, float, int, int]:
+        """(total comprado, total pendente, nº itens, nº comprados) da lista"""
+        cursor = self._reader().cursor()
+        cursor.execute(
+            "SELECT total_comprado, total_pendente, num_itens, num_comprados "
+            "FROM lista_totais WHERE lista_id=?", (lista_id,)
+        )
+        result = cursor.fetchone()
+        return tuple(result) if result else (0.0, 0.0, 0, 0)
+    
+    @_cacheado('itens', agregado=True)
+    def get_listas_stats(self, lista_ids: Optional[Sequence[int]] = None
+                         ) -> Dict[int, Tuple[int, int, float, float]]:
+        """lista_id -> (nº itens, nº comprados, total comprado, total pendente)
+        de todas as listas (ou só de lista_ids) em UMA consulta. Lê lista_totais,
+        o GROUP BY de itens mantido pelos triggers, sem varrer os itens"""
+        cursor = self._reader().cursor()
+        sql = ("SELECT lista_id, num_itens, num_comprados, total_comprado, total_pendente "
+               "FROM lista_totais")
+        if lista_ids is None:
+            cursor.execute(sql)
+        else:
+            cursor.execute(sql + " WHERE lista_id IN (SELECT value FROM json_each(?))",
+                           (json.dumps([int(lista_id) for lista_id in lista_ids]),))
+        return {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+    
+    @_cacheado('itens', agregado=True)
+    def get_revisoes(self, lista_ids: Sequence[int]) -> Dict[int, int]:
+        """lista_id -> revisão (sobe a cada mudança na lista/itens; ver migração v5)"""
+        cursor = self._reader().cursor()
+        cursor.execute(
+            "SELECT lista_id, revisao FROM lista_totais "
+            "WHERE lista_id IN (SELECT value FROM json_each(?))",
+            (json.dumps([int(lista_id) for lista_id in lista_ids]),)
+        )
+        return dict(cursor.fetchall())
+    
+    def iter_historico_itens(self, batch: int = 1000) -> Iterator[Tuple[str, int, float, float]]:
+        """(nome, id, quantidade, preço) de todos os itens, de todas as listas,
+        em ordem de id; base do autocomplete (controllers/autocomplete.py)"""
+        cursor = self._reader().cursor()
+        cursor.execute("SELECT nome, id, quantidade, preco_unit FROM itens ORDER BY id")
+        yield from self._em_lotes(cursor, batch)
+    
+    # ===== SINCRONIZAÇÃO (ver controllers/sync.py) =====
+    def get_sync_state(self, chave: str, padrao: Any = None) -> Any:
+        """Valor de sync_estado (origem, cursores...)"""
+        row = self._reader().execute("SELECT valor FROM sync_estado WHERE chave=?", (chave,)).fetchone()
+        return row[0] if row else padrao
+    
+    def set_sync_state(self, chave: str, valor: Any) -> None:
+        with self._write() as conn:
+            conn.execute("INSERT OR REPLACE INTO sync_estado (chave, valor) VALUES (?, ?)", (chave, valor))
+    
+    def get_sync_changes(self, after_seq: int = 0, limit: int = 500) -> List[Tuple]:
+        """Mudanças feitas NESTE aparelho após o cursor:
+        (seq, tabela, uid, {campo: valor}, carimbo)"""
+        cursor = self._reader().cursor()
+        cursor.execute("""
+            SELECT seq, tabela, uid, campos, carimbo FROM sync_changelog
+            WHERE seq > ? AND origem = (SELECT valor FROM sync_estado WHERE chave = 'origem')
+            ORDER BY seq LIMIT ?
+        """, (after_seq, limit))
+        return [(seq, tabela, uid, json.loads(campos), carimbo)
+                for seq, tabela, uid, campos, carimbo in cursor.fetchall()]
+    
+    def apply_sync_changes(self, mudancas: Iterable[Sequence],
+                           estado: Optional[Dict[str, Any]] = None) -> int:
+        """Grava mudanças de outros aparelhos (tabela, uid, {campo: valor}, carimbo, origem)
+        no changelog e reaplica só as linhas tocadas. `estado` (ex.: cursor do
+        servidor) é salvo na mesma transação. Retorna quantas linhas mudaram"""
+        validas = [(tabela, uid, json.dumps(campos), carimbo, origem)
+                   for tabela, uid, campos, carimbo, origem in mudancas
+                   if tabela in migrations.SYNC_CAMPOS and campos
+                   and all(campo == '_apagado' or campo in migrations.SYNC_CAMPOS[tabela] for campo in campos)]
+        # Listas antes dos itens (item novo precisa da lista); ordem de chegada dentro de cada tabela
+        tocadas = sorted(dict.fromkeys((m[0], m[1]) for m in validas), key=lambda linha: linha[0] == 'itens')
+        with self._write() as conn:
+            conn.execute("UPDATE sync_estado SET valor = 1 WHERE chave = 'aplicando'")
+            conn.executemany(
+                "INSERT INTO sync_changelog (tabela, uid, campos, carimbo, origem) VALUES (?, ?, ?, ?, ?)",
+                validas
+            )
+            alteradas = sum(self._materializar(conn, tabela, uid) for tabela, uid in tocadas)
+            conn.execute("UPDATE sync_estado SET valor = 0 WHERE chave = 'aplicando'")
+            for chave, valor in (estado or {}).items():
+                conn.execute("INSERT OR REPLACE INTO sync_estado (chave, valor) VALUES (?, ?)", (chave, valor))
+        if alteradas:
+            self.invalidate_cache()
+        return alteradas
+    
+    def _materializar(self, conn: sqlite3.Connection, tabela: str, uid: str) -> bool:
+        """Leva a linha ao valor vencedor de cada campo: maior (carimbo, origem); lápide vence tudo"""
+        campos = dict(conn.execute("""
+            SELECT campo, valor FROM (
+                SELECT j.key AS campo, j.value AS valor, ROW_NUMBER() OVER (
+                    PARTITION BY j.key ORDER BY c.carimbo DESC, c.origem DESC) AS n
+                FROM sync_changelog c, json_each(c.campos) j WHERE c.tabela = ? AND c.uid = ?
+            ) WHERE n = 1
+        """, (tabela, uid)).fetchall())
+        if '_apagado' in campos:
+            return conn.execute(f"DELETE FROM {tabela} WHERE uid=?", (uid,)).rowcount > 0
+        if 'lista' in campos:
+            row = conn.execute("SELECT id FROM listas WHERE uid=?", (campos['lista'],)).fetchone()
+            if row is None:
+                return False  # lista excluída (ou ainda não recebida)
+            campos['lista'] = row[0]
+        valores = {migrations.SYNC_COLUNAS.get(campo, campo): valor for campo, valor in campos.items()}
+        atual = conn.execute(f"SELECT {', '.join(valores)} FROM {tabela} WHERE uid=?", (uid,)).fetchone()
+        if atual is None:
+            if tabela == 'itens' and 'lista_id' not in valores:
+                return False
+            conn.execute(
+                f"INSERT INTO {tabela} (uid, {', '.join(valores)}) VALUES (?{', ?' * len(valores)})",
+                (uid, *valores.values())
+            )
+            return True
+        mudou = {coluna: valor for (coluna, valor), antes in zip(valores.items(), atual) if valor != antes}
+        if mudou:
+            conn.execute(f"UPDATE {tabela} SET {', '.join(f'{c}=?' for c in mudou)} WHERE uid=?",
+                         (*mudou.values(), uid))
+        return bool(mudou)
+    
+    # ===== MANUTENÇÃO =====
+    def rebuild_totais(self) -> None:
+        """Recalcula lista_totais do zero (backfill/reparo)"""
+        with self._write() as conn:
+            revisionado = migrations.get_version(conn) >= 5
+            if revisionado:
+                revisao = conn.execute("SELECT COALESCE(MAX(revisao), 0) FROM lista_totais").fetchone()[0]
+            conn.execute("DELETE FROM lista_totais")
+            conn.execute(migrations.TOTAIS_REBUILD_SQL)
+            if revisionado:
+                # Revisões nunca voltam: todas passam do maior valor anterior
+                conn.execute("UPDATE lista_totais SET revisao = ?", (revisao + 1,))
+        self._invalidar('itens')
+    
+    def verify_totais(self, tolerancia: float = 0.005) -> List[int]:
+        """IDs de listas cujo total materializado diverge do recalculado"""
+        cursor = self._reader().cursor()
         cursor.execute("""
-            SELECT SUM(quantidade * preco_unit) FROM itens 
-            WHERE lista_id=? AND comprado=1
-        """, (lista_id,))
-        result = cursor.fetchone()[0]
-        return result or 0.0
-
-# Instância global singleton
-db = Database()
+            SELECT l.id FROM listas l
+            LEFT JOIN lista_totais t ON t.lista_id = l.id
+            LEFT JOIN (
+                SELECT lista_id,
+                       COALESCE(SUM(CASE WHEN comprado = 1 THEN quantidade * preco_unit END), 0) AS comprado,
+                       COALESCE(SUM(CASE WHEN comprado = 0 THEN quantidade * preco_unit END), 0) AS pendente,
+                       COUNT(*) AS n, SUM(comprado = 1) AS nc
+                FROM itens GROUP BY lista_id
+            ) r ON r.lista_id = l.id
+            WHERE t.lista_id IS NULL
+               OR ABS(t.total_comprado - COALESCE(r.comprado, 0)) > ?
+               OR ABS(t.total_pendente - COALESCE(r.pendente, 0)) > ?
+               OR t.num_itens != COALESCE(r.n, 0)
+               OR t.num_comprados != COALESCE(r.nc, 0)
+        """, (tolerancia, tolerancia))
+        return [row[0] for row in cursor.fetchall()]
+
+class LazyDatabase:
+    """Proxy que só abre o banco (conexão + migrações) no primeiro uso"""
+    
+    def __init__(self, db_path: str = 'compras.db', **kwargs):
+        self.db_path = db_path
+        self._kwargs = kwargs
+        self._instance: Optional[Database] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def is_open(self) -> bool:
+        return self._instance is not None
+    
+    def get(self) -> Database:
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = Database(self.db_path, **self._kwargs)
+        return self._instance
+    
+    def close(self) -> None:
+        """Fecha só se chegou a abrir"""
+        if self._instance is not None:
+            self._instance.close()
+    
+    def __getattr__(self, nome: str):
+        return getattr(self.get(), nome)
+
+
+# Instância global singleton (aberta sob demanda, com cache de leituras)
+db = LazyDatabase(cache_size=256)
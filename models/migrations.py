@@ -0,0 +1,378 @@
+"""
+MODELO - Migrações versionadas do schema (MVC)
+Cada migração roda uma única vez, controlada por PRAGMA user_version
+Bancos antigos (compras.db sem versão) são atualizados no próprio arquivo
+"""
+import sqlite3
+from typing import Callable, List, Optional, Tuple
+
+
+def _v1_schema_inicial(conn: sqlite3.Connection) -> None:
+    """Tabelas originais (idempotente para bancos criados antes das migrações)"""
+    conn.execute('''CREATE TABLE IF NOT EXISTS listas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome TEXT NOT NULL
+    )''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS itens (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        lista_id INTEGER,
+        nome TEXT,
+        quantidade REAL,
+        preco_unit REAL,
+        comprado INTEGER DEFAULT 0,
+        FOREIGN KEY(lista_id) REFERENCES listas(id)
+    )''')
+
+
+def _v2_indices_itens(conn: sqlite3.Connection) -> None:
+    """Índices compostos: get_itens (ORDER BY id) e totais por status"""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_itens_lista_id ON itens (lista_id, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_itens_lista_comprado ON itens (lista_id, comprado)")
+
+
+# Recalcula lista_totais a partir de itens (backfill e reparo)
+TOTAIS_REBUILD_SQL = '''
+    INSERT INTO lista_totais (lista_id, total_comprado, total_pendente, num_itens, num_comprados)
+    SELECT l.id,
+           COALESCE(SUM(CASE WHEN i.comprado = 1 THEN i.quantidade * i.preco_unit END), 0),
+           COALESCE(SUM(CASE WHEN i.comprado = 0 THEN i.quantidade * i.preco_unit END), 0),
+           COUNT(i.id),
+           COALESCE(SUM(i.comprado = 1), 0)
+    FROM listas l LEFT JOIN itens i ON i.lista_id = l.id
+    GROUP BY l.id
+'''
+
+
+def _v3_totais_materializados(conn: sqlite3.Connection) -> None:
+    """Tabela lista_totais mantida por triggers (total em O(1))"""
+    conn.execute('''CREATE TABLE IF NOT EXISTS lista_totais (
+        lista_id INTEGER PRIMARY KEY,
+        total_comprado REAL NOT NULL DEFAULT 0,
+        total_pendente REAL NOT NULL DEFAULT 0,
+        num_itens INTEGER NOT NULL DEFAULT 0,
+        num_comprados INTEGER NOT NULL DEFAULT 0
+    )''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_listas_totais_ins
+        AFTER INSERT ON listas BEGIN
+            INSERT OR IGNORE INTO lista_totais (lista_id) VALUES (NEW.id);
+        END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_listas_totais_del
+        AFTER DELETE ON listas BEGIN
+            DELETE FROM lista_totais WHERE lista_id = OLD.id;
+        END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_itens_totais_ins
+        AFTER INSERT ON itens BEGIN
+            INSERT OR IGNORE INTO lista_totais (lista_id) VALUES (NEW.lista_id);
+            UPDATE lista_totais SET
+                total_comprado = total_comprado + CASE WHEN NEW.comprado = 1
+                    THEN COALESCE(NEW.quantidade * NEW.preco_unit, 0) ELSE 0 END,
+                total_pendente = total_pendente + CASE WHEN NEW.comprado = 1
+                    THEN 0 ELSE COALESCE(NEW.quantidade * NEW.preco_unit, 0) END,
+                num_itens = num_itens + 1,
+                num_comprados = num_comprados + (NEW.comprado = 1)
+            WHERE lista_id = NEW.lista_id;
+        END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_itens_totais_del
+        AFTER DELETE ON itens BEGIN
+            UPDATE lista_totais SET
+                total_comprado = total_comprado - CASE WHEN OLD.comprado = 1
+                    THEN COALESCE(OLD.quantidade * OLD.preco_unit, 0) ELSE 0 END,
+                total_pendente = total_pendente - CASE WHEN OLD.comprado = 1
+                    THEN 0 ELSE COALESCE(OLD.quantidade * OLD.preco_unit, 0) END,
+                num_itens = num_itens - 1,
+                num_comprados = num_comprados - (OLD.comprado = 1)
+            WHERE lista_id = OLD.lista_id;
+        END''')
+    # UPDATE = remove a contribuição antiga e soma a nova (cobre troca de lista)
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_itens_totais_upd
+        AFTER UPDATE OF lista_id, quantidade, preco_unit, comprado ON itens BEGIN
+            UPDATE lista_totais SET
+                total_comprado = total_comprado - CASE WHEN OLD.comprado = 1
+                    THEN COALESCE(OLD.quantidade * OLD.preco_unit, 0) ELSE 0 END,
+                total_pendente = total_pendente - CASE WHEN OLD.comprado = 1
+                    THEN 0 ELSE COALESCE(OLD.quantidade * OLD.preco_unit, 0) END,
+                num_itens = num_itens - 1,
+                num_comprados = num_comprados - (OLD.comprado = 1)
+            WHERE lista_id = OLD.lista_id;
+            INSERT OR IGNORE INTO lista_totais (lista_id) VALUES (NEW.lista_id);
+            UPDATE lista_totais SET
+                total_comprado = total_comprado + CASE WHEN NEW.comprado = 1
+                    THEN COALESCE(NEW.quantidade * NEW.preco_unit, 0) ELSE 0 END,
+                total_pendente = total_pendente + CASE WHEN NEW.comprado = 1
+                    THEN 0 ELSE COALESCE(NEW.quantidade * NEW.preco_unit, 0) END,
+                num_itens = num_itens + 1,
+                num_comprados = num_comprados + (NEW.comprado = 1)
+            WHERE lista_id = NEW.lista_id;
+        END''')
+    conn.execute("DELETE FROM lista_totais")
+    conn.execute(TOTAIS_REBUILD_SQL)
+
+
+def fts5_disponivel(conn: sqlite3.Connection) -> bool:
+    """Verifica se a build do SQLite tem o módulo FTS5"""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp._fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp._fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _v4_busca_fts(conn: sqlite3.Connection) -> None:
+    """Índices FTS5 (sem acento, com prefixo) para nomes de listas e itens.
+    Sem FTS5 a migração não cria nada e a busca usa o caminho LIKE"""
+    if not fts5_disponivel(conn):
+        return
+    for tabela in ('listas', 'itens'):
+        conn.execute(f'''CREATE VIRTUAL TABLE IF NOT EXISTS {tabela}_fts USING fts5(
+            nome, content='{tabela}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )''')
+        conn.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_{tabela}_fts_ins
+            AFTER INSERT ON {tabela} BEGIN
+                INSERT INTO {tabela}_fts (rowid, nome) VALUES (NEW.id, NEW.nome);
+            END''')
+        conn.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_{tabela}_fts_del
+            AFTER DELETE ON {tabela} BEGIN
+                INSERT INTO {tabela}_fts ({tabela}_fts, rowid, nome) VALUES ('delete', OLD.id, OLD.nome);
+            END''')
+        conn.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_{tabela}_fts_upd
+            AFTER UPDATE OF nome ON {tabela} BEGIN
+                INSERT INTO {tabela}_fts ({tabela}_fts, rowid, nome) VALUES ('delete', OLD.id, OLD.nome);
+                INSERT INTO {tabela}_fts (rowid, nome) VALUES (NEW.id, NEW.nome);
+            END''')
+        conn.execute(f"INSERT INTO {tabela}_fts ({tabela}_fts) VALUES ('rebuild')")
+
+
+def _v5_revisao_listas(conn: sqlite3.Connection) -> None:
+    """lista_totais.revisao: sobe a cada mudança na lista ou em seus itens
+    (chave do cache de exportações). Os triggers de itens da v3 são recriados
+    para incrementar a revisão no mesmo UPDATE dos totais"""
+    conn.execute("ALTER TABLE lista_totais ADD COLUMN revisao INTEGER NOT NULL DEFAULT 0")
+    for sufixo in ('ins', 'del', 'upd'):
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_itens_totais_{sufixo}")
+    conn.execute('''CREATE TRIGGER trg_itens_totais_ins
+        AFTER INSERT ON itens BEGIN
+            INSERT OR IGNORE INTO lista_totais (lista_id) VALUES (NEW.lista_id);
+            UPDATE lista_totais SET
+                total_comprado = total_comprado + CASE WHEN NEW.comprado = 1
+                    THEN COALESCE(NEW.quantidade * NEW.preco_unit, 0) ELSE 0 END,
+                total_pendente = total_pendente + CASE WHEN NEW.comprado = 1
+                    THEN 0 ELSE COALESCE(NEW.quantidade * NEW.preco_unit, 0) END,
+                num_itens = num_itens + 1,
+                num_comprados = num_comprados + (NEW.comprado = 1),
+                revisao = revisao + 1
+            WHERE lista_id = NEW.lista_id;
+        END''')
+    conn.execute('''CREATE TRIGGER trg_itens_totais_del
+        AFTER DELETE ON itens BEGIN
+            UPDATE lista_totais SET
+                total_comprado = total_comprado - CASE WHEN OLD.comprado = 1
+                    THEN COALESCE(OLD.quantidade * OLD.preco_unit, 0) ELSE 0 END,
+                total_pendente = total_pendente - CASE WHEN OLD.comprado = 1
+                    THEN 0 ELSE COALESCE(OLD.quantidade * OLD.preco_unit, 0) END,
+                num_itens = num_itens - 1,
+                num_comprados = num_comprados - (OLD.comprado = 1),
+                revisao = revisao + 1
+            WHERE lista_id = OLD.lista_id;
+        END''')
+    conn.execute('''CREATE TRIGGER trg_itens_totais_upd
+        AFTER UPDATE OF lista_id, quantidade, preco_unit, comprado ON itens BEGIN
+            UPDATE lista_totais SET
+                total_comprado = total_comprado - CASE WHEN OLD.comprado = 1
+                    THEN COALESCE(OLD.quantidade * OLD.preco_unit, 0) ELSE 0 END,
+                total_pendente = total_pendente - CASE WHEN OLD.comprado = 1
+                    THEN 0 ELSE COALESCE(OLD.quantidade * OLD.preco_unit, 0) END,
+                num_itens = num_itens - 1,
+                num_comprados = num_comprados - (OLD.comprado = 1),
+                revisao = revisao + 1
+            WHERE lista_id = OLD.lista_id;
+            INSERT OR IGNORE INTO lista_totais (lista_id) VALUES (NEW.lista_id);
+            UPDATE lista_totais SET
+                total_comprado = total_comprado + CASE WHEN NEW.comprado = 1
+                    THEN COALESCE(NEW.quantidade * NEW.preco_unit, 0) ELSE 0 END,
+                total_pendente = total_pendente + CASE WHEN NEW.comprado = 1
+                    THEN 0 ELSE COALESCE(NEW.quantidade * NEW.preco_unit, 0) END,
+                num_itens = num_itens + 1,
+                num_comprados = num_comprados + (NEW.comprado = 1),
+                revisao = revisao + 1
+            WHERE lista_id = NEW.lista_id;
+        END''')
+    # Nomes não mexem nos totais, só na revisão
+    conn.execute('''CREATE TRIGGER trg_itens_revisao_nome
+        AFTER UPDATE OF nome ON itens BEGIN
+            UPDATE lista_totais SET revisao = revisao + 1 WHERE lista_id = NEW.lista_id;
+        END''')
+    conn.execute('''CREATE TRIGGER trg_listas_revisao_nome
+        AFTER UPDATE OF nome ON listas BEGIN
+            UPDATE lista_totais SET revisao = revisao + 1 WHERE lista_id = NEW.id;
+        END''')
+
+
+def _v6_itens_cascade(conn: sqlite3.Connection) -> None:
+    """itens.lista_id com ON DELETE CASCADE (NOT NULL). SQLite não altera FK:
+    a tabela é recriada com os mesmos ids; índices e triggers (totais,
+    revisão, FTS) são recriados a partir do próprio sqlite_master.
+    Itens órfãos (lista inexistente ou nula) são removidos antes da cópia"""
+    conn.execute("DELETE FROM itens WHERE lista_id IS NULL OR lista_id NOT IN (SELECT id FROM listas)")
+    conn.execute("DELETE FROM lista_totais WHERE lista_id NOT IN (SELECT id FROM listas)")
+    dependentes = [row[0] for row in conn.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name='itens' AND type IN ('index', 'trigger') "
+        "AND sql IS NOT NULL ORDER BY type, name"
+    )]
+    sequencia = conn.execute("SELECT seq FROM sqlite_sequence WHERE name='itens'").fetchone()
+    conn.execute('''CREATE TABLE itens_novo (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        lista_id INTEGER NOT NULL,
+        nome TEXT,
+        quantidade REAL,
+        preco_unit REAL,
+        comprado INTEGER DEFAULT 0,
+        FOREIGN KEY(lista_id) REFERENCES listas(id) ON DELETE CASCADE
+    )''')
+    conn.execute('''INSERT INTO itens_novo (id, lista_id, nome, quantidade, preco_unit, comprado)
+        SELECT id, lista_id, nome, quantidade, preco_unit, comprado FROM itens''')
+    conn.execute("DROP TABLE itens")  # leva junto índices e triggers
+    conn.execute("ALTER TABLE itens_novo RENAME TO itens")
+    for sql in dependentes:
+        conn.execute(sql)
+    if sequencia is not None:
+        # ids de itens excluídos não voltam a ser usados
+        conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name='itens'", (sequencia[0],))
+
+
+# ===== SINCRONIZAÇÃO (v7) =====
+# Campos sincronizados por tabela: nome no changelog -> expressão sobre a linha
+SYNC_CAMPOS = {
+    'listas': {'nome': "{r}.nome"},
+    'itens': {
+        'lista': "(SELECT uid FROM listas WHERE id = {r}.lista_id)",
+        'nome': "{r}.nome",
+        'quantidade': "{r}.quantidade",
+        'preco_unit': "{r}.preco_unit",
+        'comprado': "{r}.comprado",
+    },
+}
+SYNC_COLUNAS = {'lista': 'lista_id'}  # campo do changelog -> coluna (quando difere)
+
+# Carimbo (ms): relógio de parede, mas sempre acima de tudo que o banco já viu
+# (inclusive mudanças recebidas de outros aparelhos) -> relógio híbrido.
+# MAX(carimbo) é uma busca no fim de idx_sync_carimbo, uma vez por linha alterada
+_SYNC_CARIMBO = ("MAX(CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER), "
+                 "(SELECT COALESCE(MAX(carimbo), 0) + 1 FROM sync_changelog))")
+_SYNC_ORIGEM = "(SELECT valor FROM sync_estado WHERE chave = 'origem')"
+# Mudanças aplicadas pela própria sincronização não voltam ao changelog como locais
+_SYNC_LOCAL = "(SELECT valor FROM sync_estado WHERE chave = 'aplicando') = 0"
+_SYNC_INSERT = "INSERT INTO sync_changelog (tabela, uid, campos, carimbo, origem)"
+
+
+def _sync_campos(tabela: str, linha: str) -> str:
+    """json_object com todos os campos sincronizados da linha"""
+    pares = ", ".join(f"'{campo}', {expr.format(r=linha)}" for campo, expr in SYNC_CAMPOS[tabela].items())
+    return f"json_object({pares})"
+
+
+def _sync_alterados(tabela: str) -> str:
+    """json_object só com os campos em que OLD e NEW diferem (a máscara da mudança)"""
+    partes = []
+    for campo, expr in SYNC_CAMPOS[tabela].items():
+        coluna = SYNC_COLUNAS.get(campo, campo)
+        partes.append(f"SELECT '{campo}' AS campo, {expr.format(r='NEW')} AS valor "
+                      f"WHERE OLD.{coluna} IS NOT NEW.{coluna}")
+    return f"(SELECT json_group_object(campo, valor) FROM ({' UNION ALL '.join(partes)}))"
+
+
+def _v7_sync_changelog(conn: sqlite3.Connection) -> None:
+    """Sincronização entre aparelhos: uid global por linha e changelog
+    append-only alimentado por triggers: um registro por linha alterada,
+    com os campos mudados num objeto JSON (campo -> valor), carimbo e origem.
+    {"_apagado": 1} é a lápide de uma linha excluída"""
+    conn.execute('''CREATE TABLE sync_estado (
+        chave TEXT PRIMARY KEY,
+        valor
+    ) WITHOUT ROWID''')
+    conn.execute("INSERT INTO sync_estado VALUES ('origem', lower(hex(randomblob(8))))")
+    conn.execute("INSERT INTO sync_estado VALUES ('aplicando', 0)")
+    conn.execute('''CREATE TABLE sync_changelog (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        tabela TEXT NOT NULL,
+        uid TEXT NOT NULL,
+        campos TEXT NOT NULL,
+        carimbo INTEGER NOT NULL,
+        origem TEXT NOT NULL
+    )''')
+    conn.execute("CREATE INDEX idx_sync_linha ON sync_changelog (tabela, uid, carimbo)")
+    conn.execute("CREATE INDEX idx_sync_carimbo ON sync_changelog (carimbo)")
+    conn.execute("CREATE INDEX idx_sync_origem ON sync_changelog (origem, seq)")  # envio
+    for tabela in ('listas', 'itens'):
+        conn.execute(f"ALTER TABLE {tabela} ADD COLUMN uid TEXT")
+        conn.execute(f"UPDATE {tabela} SET uid = lower(hex(randomblob(16)))")
+        conn.execute(f"CREATE UNIQUE INDEX idx_{tabela}_uid ON {tabela} (uid)")
+        # Estado atual entra no changelog (listas antes dos itens: ordem de envio)
+        conn.execute(f'''{_SYNC_INSERT}
+            SELECT '{tabela}', t.uid, {_sync_campos(tabela, 't')}, {_SYNC_CARIMBO}, {_SYNC_ORIGEM}
+            FROM {tabela} t ORDER BY t.id''')
+        colunas = ", ".join(SYNC_COLUNAS.get(campo, campo) for campo in SYNC_CAMPOS[tabela])
+        mudou = " OR ".join(f"OLD.{coluna} IS NOT NEW.{coluna}" for coluna in colunas.split(", "))
+        conn.execute(f'''CREATE TRIGGER trg_{tabela}_sync_ins
+            AFTER INSERT ON {tabela} BEGIN
+                UPDATE {tabela} SET uid = lower(hex(randomblob(16))) WHERE id = NEW.id AND NEW.uid IS NULL;
+                {_SYNC_INSERT}
+                SELECT '{tabela}', (SELECT uid FROM {tabela} WHERE id = NEW.id), {_sync_campos(tabela, 'NEW')},
+                       {_SYNC_CARIMBO}, {_SYNC_ORIGEM}
+                WHERE {_SYNC_LOCAL};
+            END''')
+        conn.execute(f'''CREATE TRIGGER trg_{tabela}_sync_upd
+            AFTER UPDATE OF {colunas} ON {tabela} WHEN {mudou} BEGIN
+                {_SYNC_INSERT}
+                SELECT '{tabela}', NEW.uid, {_sync_alterados(tabela)}, {_SYNC_CARIMBO}, {_SYNC_ORIGEM}
+                WHERE {_SYNC_LOCAL};
+            END''')
+        # Item apagado em cascata (lista já removida) não gera lápide própria:
+        # a da lista apaga os itens do outro lado também
+        orfao = " AND EXISTS (SELECT 1 FROM listas WHERE id = OLD.lista_id)" if tabela == 'itens' else ""
+        conn.execute(f'''CREATE TRIGGER trg_{tabela}_sync_del
+            AFTER DELETE ON {tabela} BEGIN
+                {_SYNC_INSERT}
+                SELECT '{tabela}', OLD.uid, '{{"_apagado":1}}', {_SYNC_CARIMBO}, {_SYNC_ORIGEM}
+                WHERE OLD.uid IS NOT NULL{orfao} AND {_SYNC_LOCAL};
+            END''')
+
+
+# (versão, descrição, função) - SEMPRE adicionar no final, nunca reordenar
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "schema inicial", _v1_schema_inicial),
+    (2, "índices de itens por lista", _v2_indices_itens),
+    (3, "totais materializados por lista", _v3_totais_materializados),
+    (4, "busca FTS5 em nomes", _v4_busca_fts),
+    (5, "revisão por lista", _v5_revisao_listas),
+    (6, "itens com ON DELETE CASCADE", _v6_itens_cascade),
+    (7, "changelog de sincronização", _v7_sync_changelog),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_version(conn: sqlite3.Connection) -> int:
+    """Versão atual do schema gravada no arquivo"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection, target: Optional[int] = None) -> int:
+    """Aplica migrações pendentes (até target), cada uma em sua transação.
+    Retorna a versão final"""
+    atual = get_version(conn)
+    target = LATEST_VERSION if target is None else target
+    for versao, descricao, func in MIGRATIONS:
+        if versao <= atual or versao > target:
+            continue
+        try:
+            conn.execute("BEGIN")
+            func(conn)
+            conn.execute(f"PRAGMA user_version = {int(versao)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        atual = versao
+    return atual
@@ -0,0 +1,30 @@
+"""
+MODELO - Tipos das linhas retornadas pelo Database
+Tuplas nomeadas com __slots__ vazio: sem __dict__ por linha, comparáveis e
+ainda desempacotáveis por posição. Criadas direto pelo row_factory do cursor;
+subtotal (quantidade * preço) vem calculado do SQL, uma vez, na consulta.
+"""
+import functools
+from collections import namedtuple
+from typing import Callable
+
+
+class Lista(namedtuple('Lista', 'id nome')):
+    __slots__ = ()
+
+
+class Item(namedtuple('Item', 'id nome quantidade preco_unit comprado subtotal')):
+    """subtotal = quantidade * preco_unit (comprado ou não)"""
+    __slots__ = ()
+
+
+class ItemExportado(namedtuple('ItemExportado', 'lista_id lista nome quantidade preco_unit comprado subtotal')):
+    """Linha de Database.iter_export_rows (item + nome da lista)"""
+    __slots__ = ()
+
+
+@functools.lru_cache(maxsize=None)
+def row_factory(tipo: type) -> Callable:
+    """row_factory de sqlite3 que monta `tipo` sem passar por __new__/kwargs"""
+    novo = tuple.__new__
+    return lambda cursor, row: novo(tipo, row)
@@ -0,0 +1,28 @@
+from controllers.importer import parse_itens
+
+
+def _parse(linhas):
+    erros = []
+    return list(parse_itens(linhas, erros)), erros
+
+
+def test_texto_colado_com_virgula_decimal():
+    itens, erros = _parse(['Banana 1,5 4,99', 'Queijo 0,5 32,90', 'Café 1 R$20,00'])
+    assert itens == [('Banana', 1.5, 4.99), ('Queijo', 0.5, 32.9), ('Café', 1.0, 20.0)]
+    assert erros == []
+
+
+def test_delimitadores_misturados_linha_a_linha():
+    itens, erros = _parse(['Arroz 2 10', 'Leite;3;4,50', 'Café\t1\t20', '"Feijão, preto",2,7.5'])
+    assert itens == [('Arroz', 2.0, 10.0), ('Leite', 3.0, 4.5), ('Café', 1.0, 20.0), ('Feijão, preto', 2.0, 7.5)]
+    assert erros == []
+
+
+def test_cabecalho_e_erros():
+    itens, erros = _parse(['nome;qtd;preco', 'Arroz;0;10', 'Pão;2;x', 'sozinho'])
+    assert itens == []
+    assert [(e.linha, e.erro) for e in erros] == [
+        (2, "quantidade inválida: '0'"),
+        (3, "preço inválido: 'x'"),
+        (4, "esperado: nome, qtd, preço"),
+    ]
@@ -0,0 +1,29 @@
+"""
+LOG ESTRUTURADO - Substitui os print() de depuração
+Nível via variável de ambiente COMPRAS_LOG (DEBUG, INFO, WARNING...; padrão INFO)
+Mensagens usam argumentos %s: desligado, o custo é só o teste de nível
+"""
+import logging
+import os
+import sys
+
+LOG_ENV = 'COMPRAS_LOG'
+_RAIZ = 'compras'
+
+
+def _configurar(raiz: logging.Logger) -> None:
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter(
+        "%(asctime)s %(levelname)-5s %(name)s: %(message)s", "%H:%M:%S"
+    ))
+    raiz.addHandler(handler)
+    raiz.setLevel(os.environ.get(LOG_ENV, 'INFO').upper())
+    raiz.propagate = False  # não mistura com o Logger do Kivy
+
+
+def get_logger(nome: str) -> logging.Logger:
+    """Logger filho de 'compras' (ex.: get_logger('home') -> compras.home)"""
+    raiz = logging.getLogger(_RAIZ)
+    if not raiz.handlers:
+        _configurar(raiz)
+    return raiz.getChild(nome)
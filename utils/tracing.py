@@ -0,0 +1,251 @@
+"""
+INSTRUMENTAÇÃO - Latência por evento (opcional, plugável)
+install() envolve os dispatchers handle_event, os métodos públicos de
+Database e AsyncDatabase._submit. Sem install() nada muda (custo zero).
+
+Por evento mede: handler (síncrono), db (soma das consultas, em qualquer
+thread), ui (callbacks que atualizam a view), layout (até o próximo frame,
+se houver gancho de frame) e total; conta as consultas disparadas.
+Geradores (iter_*) contam o tempo de cada passo até esgotar ou fechar.
+Histogramas por ação com p50/p95/p99; exporta em JSON ou para o overlay.
+"""
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from typing import Callable, Deque, Dict, Iterator, List, Optional
+
+from utils.log import get_logger
+
+log = get_logger('trace')
+
+METRICAS = ('total_ms', 'handler_ms', 'db_ms', 'ui_ms', 'layout_ms', 'queries')
+AMOSTRAS_MAX = 2048  # por ação/métrica (janela deslizante)
+
+# Métodos de Database que não são consultas do dia a dia
+_DB_IGNORAR = {'close', 'migrate', 'get', 'is_open', 'cache_stats', 'invalidate_cache'}
+
+_evento_atual: ContextVar[Optional['EventTrace']] = ContextVar('evento_atual', default=None)
+_local = threading.local()  # profundidade de chamadas aninhadas (get_listas -> search_listas)
+
+
+def _percentil(ordenados: List[float], p: float) -> float:
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def _medir_gerador(evento: 'EventTrace', gerador: Iterator) -> Iterator:
+    """Repassa o gerador contando só o tempo gasto dentro dele (não o do consumidor)"""
+    gasto = 0.0
+    try:
+        while True:
+            profundidade = getattr(_local, 'profundidade', 0)
+            _local.profundidade = 1
+            inicio = time.perf_counter()
+            try:
+                item = next(gerador)
+            except StopIteration:
+                return
+            finally:
+                gasto += time.perf_counter() - inicio
+                _local.profundidade = profundidade
+            yield item
+    finally:
+        gerador.close()
+        evento.add_db(gasto * 1000)
+
+
+class EventTrace:
+    """Um evento da UI e tudo que ele disparou (consultas, callbacks)"""
+    __slots__ = ('tracer', 'action', 'inicio', 'handler_ms', 'db_ms', 'ui_ms',
+                 'layout_ms', 'queries', 'pendentes', 'lock')
+
+    def __init__(self, tracer: 'Tracer', action: str):
+        self.tracer = tracer
+        self.action = action
+        self.inicio = time.perf_counter()
+        self.handler_ms = self.db_ms = self.ui_ms = self.layout_ms = 0.0
+        self.queries = 0
+        self.pendentes = 1  # o próprio handler
+        self.lock = threading.Lock()
+
+    def add_db(self, ms: float) -> None:
+        with self.lock:
+            self.db_ms += ms
+            self.queries += 1
+
+    def begin(self) -> None:
+        """Operação assíncrona associada ao evento começou"""
+        with self.lock:
+            self.pendentes += 1
+
+    def end(self) -> None:
+        """Operação terminou; o último a terminar fecha o evento"""
+        with self.lock:
+            self.pendentes -= 1
+            fechar = self.pendentes == 0
+        if fechar:
+            self.tracer._fechar(self)
+
+
+class Tracer:
+    """Coleta spans e mantém histogramas por ação"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._amostras: Dict[str, Dict[str, Deque[float]]] = defaultdict(
+            lambda: {m: deque(maxlen=AMOSTRAS_MAX) for m in METRICAS}
+        )
+        self._contagem: Dict[str, int] = defaultdict(int)
+        # Gancho opcional: agenda func para o próximo frame (Clock no app)
+        self.proximo_frame: Optional[Callable[[Callable[[], None]], None]] = None
+
+    # ===== COLETA =====
+    def wrap_dispatcher(self, handle_event: Callable) -> Callable:
+        @functools.wraps(handle_event)
+        def traced(action: str, *args):
+            evento = EventTrace(self, action)
+            token = _evento_atual.set(evento)
+            inicio = time.perf_counter()
+            try:
+                return handle_event(action, *args)
+            finally:
+                evento.handler_ms = (time.perf_counter() - inicio) * 1000
+                _evento_atual.reset(token)
+                evento.end()
+        return traced
+
+    def wrap_query(self, nome: str, func: Callable) -> Callable:
+        if inspect.isgeneratorfunction(func):
+            return self._wrap_gerador(func)
+
+        @functools.wraps(func)
+        def traced(*args, **kwargs):
+            evento = _evento_atual.get()
+            profundidade = getattr(_local, 'profundidade', 0)
+            if evento is None or profundidade:
+                return func(*args, **kwargs)
+            _local.profundidade = 1
+            inicio = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _local.profundidade = 0
+                evento.add_db((time.perf_counter() - inicio) * 1000)
+        return traced
+
+    def _wrap_gerador(self, func: Callable) -> Callable:
+        """iter_*: a consulta roda enquanto o gerador é consumido, não na
+        criação; soma o tempo de cada passo até esgotar ou fechar"""
+        @functools.wraps(func)
+        def traced(*args, **kwargs):
+            evento = _evento_atual.get()
+            if evento is None or getattr(_local, 'profundidade', 0):
+                return func(*args, **kwargs)
+            return _medir_gerador(evento, func(*args, **kwargs))
+        return traced
+
+    def wrap_async_submit(self, submit: Callable) -> Callable:
+        """Propaga o evento atual para a thread do banco e para o callback"""
+        @functools.wraps(submit)
+        def traced(executor, func, callback, errback):
+            evento = _evento_atual.get()
+            if evento is None:
+                return submit(executor, func, callback, errback)
+            evento.begin()
+
+            def no_evento(f):
+                def run(*args):
+                    token = _evento_atual.set(evento)
+                    try:
+                        return f(*args)
+                    finally:
+                        _evento_atual.reset(token)
+                return run
+
+            def finalizar(f):
+                def run(*args):
+                    inicio = time.perf_counter()
+                    try:
+                        if f:
+                            no_evento(f)(*args)
+                    finally:
+                        evento.ui_ms += (time.perf_counter() - inicio) * 1000
+                        evento.end()
+                return run
+
+            if errback is None:
+                errback = lambda erro: log.error("❌ Erro no banco: %s", erro)
+            future = submit(executor, no_evento(func), finalizar(callback), finalizar(errback))
+            # Cancelado antes de rodar: nenhum callback vem, fecha aqui
+            future.add_done_callback(lambda f: evento.end() if f.cancelled() else None)
+            return future
+        return traced
+
+    def _fechar(self, evento: EventTrace) -> None:
+        if self.proximo_frame is None:
+            self._registrar(evento)
+            return
+        marca = time.perf_counter()
+
+        def no_frame():
+            evento.layout_ms = (time.perf_counter() - marca) * 1000
+            self._registrar(evento)
+        self.proximo_frame(no_frame)
+
+    def _registrar(self, evento: EventTrace) -> None:
+        total_ms = (time.perf_counter() - evento.inicio) * 1000
+        with self._lock:
+            amostras = self._amostras[evento.action]
+            amostras['total_ms'].append(total_ms)
+            amostras['handler_ms'].append(evento.handler_ms)
+            amostras['db_ms'].append(evento.db_ms)
+            amostras['ui_ms'].append(evento.ui_ms)
+            amostras['layout_ms'].append(evento.layout_ms)
+            amostras['queries'].append(evento.queries)
+            self._contagem[evento.action] += 1
+        log.debug("⏱️ %s: total %.1f ms (handler %.1f, db %.1f em %d consultas, ui %.1f, layout %.1f)",
+                  evento.action, total_ms, evento.handler_ms, evento.db_ms, evento.queries,
+                  evento.ui_ms, evento.layout_ms)
+
+    # ===== RELATÓRIO =====
+    def summary(self) -> Dict[str, dict]:
+        """{ação: {n, métrica: {p50, p95, p99}}}"""
+        with self._lock:
+            copia = {acao: {m: sorted(v) for m, v in met.items()} for acao, met in self._amostras.items()}
+            contagem = dict(self._contagem)
+        resumo = {}
+        for acao, metricas in copia.items():
+            resumo[acao] = {'n': contagem[acao]}
+            for nome, valores in metricas.items():
+                resumo[acao][nome] = {f'p{p}': _percentil(valores, p) for p in (50, 95, 99)}
+        return resumo
+
+    def dump(self, caminho: str) -> None:
+        with open(caminho, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+        log.info("💾 Trace salvo em %s", caminho)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._amostras.clear()
+            self._contagem.clear()
+
+
+def install(controllers: List, database_cls: type, async_db=None) -> Tracer:
+    """Liga a instrumentação nos controllers, na classe Database e no AsyncDatabase"""
+    tracer = Tracer()
+    for controller in controllers:
+        controller.handle_event = tracer.wrap_dispatcher(controller.handle_event)
+    for nome in dir(database_cls):
+        metodo = getattr(database_cls, nome)
+        if nome.startswith('_') or nome in _DB_IGNORAR or not callable(metodo):
+            continue
+        setattr(database_cls, nome, tracer.wrap_query(nome, metodo))
+    if async_db is not None:
+        async_db._submit = tracer.wrap_async_submit(async_db._submit)
+    return tracer
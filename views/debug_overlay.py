@@ -0,0 +1,40 @@
+"""
+VIEW DEBUG - Overlay com latências por ação (p50/p95/p99)
+Ligado por COMPRAS_TRACE=overlay; lê o resumo do Tracer uma vez por segundo
+"""
+from kivy.clock import Clock
+from kivy.graphics import Color, Rectangle
+from kivy.uix.label import Label
+
+
+class DebugOverlay(Label):
+    def __init__(self, tracer, intervalo: float = 1.0, **kwargs):
+        super().__init__(
+            font_size='11sp', halign='left', valign='top', color=(1, 1, 1, 1),
+            size_hint=(None, None), **kwargs
+        )
+        self.tracer = tracer
+        with self.canvas.before:
+            Color(0, 0, 0, 0.6)
+            self._fundo = Rectangle(pos=self.pos, size=self.size)
+        self.bind(pos=self._ajustar_fundo, texture_size=self._ajustar_tamanho)
+        Clock.schedule_interval(self._atualizar, intervalo)
+
+    def _ajustar_tamanho(self, *args):
+        self.size = self.texture_size
+        self.top = self.parent.height if self.parent else self.top
+
+    def _ajustar_fundo(self, *args):
+        self._fundo.pos = self.pos
+        self._fundo.size = self.size
+
+    def _atualizar(self, dt):
+        linhas = ["ação                  n   total p50/p95/p99 ms   db   q/ev"]
+        for acao, m in sorted(self.tracer.summary().items()):
+            total = m['total_ms']
+            linhas.append(
+                f"{acao[:20]:<20}{m['n']:>4}  {total['p50']:6.1f}/{total['p95']:6.1f}/{total['p99']:6.1f}"
+                f"  {m['db_ms']['p50']:5.1f}  {m['queries']['p50']:4.0f}"
+            )
+        self.text = "\n".join(linhas)
+        self._ajustar_fundo()
@@ -12,8 +12,19 @@ from kivymd.uix.toolbar import MDTopAppBar
 from kivymd.uix.card import MDCard
 from kivymd.uix.dialog import MDDialog
 from kivymd.uix.selectioncontrol import MDCheckbox
+from kivymd.uix.progressbar import MDProgressBar
+from kivy.clock import Clock
 from kivy.uix.screenmanager import Screen
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.properties import BooleanProperty, NumericProperty, StringProperty
 from typing import Callable, List
+from utils.log import get_logger
+
+log = get_logger('home_view')
+
+DEBOUNCE_S = 0.15  # pausa na digitação antes de filtrar
 
 # ✅ IMPORTS ANDROID (só funcionam no APK, desktop ignora)
 try:
@@ -24,6 +35,91 @@ except ImportError:
     ANDROID_AVAILABLE = False
     platform = "desktop"  # Mock para desktop
 
+class ListaCard(RecycleDataViewBehavior, MDCard):
+    """Card de lista reciclável: widgets criados uma vez, só os dados mudam"""
+    lista_id = NumericProperty(0)
+    nome = StringProperty("")
+    selecionada = BooleanProperty(False)
+    num_itens = NumericProperty(0)
+    num_comprados = NumericProperty(0)
+    total_comprado = NumericProperty(0)
+    total_pendente = NumericProperty(0)
+
+    def __init__(self, **kwargs):
+        super().__init__(radius=[12], padding=15, elevation=2, **kwargs)
+        self.owner = None
+        self.rv = None
+        self.index = None
+        layout = MDBoxLayout(orientation='horizontal', spacing=8, adaptive_height=True)
+
+        # Checkbox (on_release: não dispara quando o card é reciclado)
+        self.checkbox = MDCheckbox(size_hint_x=None, width=48)
+        self.checkbox.bind(on_release=lambda x: self._toggle_selecao(x.active))
+
+        # Nome + resumo (itens comprados / totais) + progresso
+        info = MDBoxLayout(orientation='vertical', spacing=4)
+        self.nome_label = MDLabel(theme_text_color="Primary")
+        self.resumo_label = MDLabel(theme_text_color="Secondary", font_style="Caption")
+        self.barra = MDProgressBar(max=100, value=0, size_hint_y=None, height=4)
+        info.add_widget(self.nome_label)
+        info.add_widget(self.resumo_label)
+        info.add_widget(self.barra)
+
+        # Botões (chamam Controller com o ID atual do card)
+        btn_excel = MDIconButton(
+            icon="file-excel", icon_color=(0, 0.8, 0, 1), size_hint_x=None, width=48,
+            on_release=lambda x: self.owner.controller_callback('export_excel', [self.lista_id])
+        )
+        btn_pdf = MDIconButton(
+            icon="file-pdf-box", icon_color=(0.8, 0, 0, 1), size_hint_x=None, width=48,
+            on_release=lambda x: self.owner.controller_callback('export_pdf', [self.lista_id])
+        )
+        btn_csv = MDIconButton(
+            icon="file-delimited", size_hint_x=None, width=48,
+            on_release=lambda x: self.owner.controller_callback('export_formato', [self.lista_id], 'csv')
+        )
+        btn_jsonl = MDIconButton(
+            icon="code-json", size_hint_x=None, width=48,
+            on_release=lambda x: self.owner.controller_callback('export_formato', [self.lista_id], 'jsonl')
+        )
+        btn_delete = MDIconButton(
+            icon="trash-can-outline", icon_color=(1, 0, 0, 1), size_hint_x=None, width=48,
+            on_release=lambda x: self.owner.controller_callback('confirm_delete_lista', self.lista_id)
+        )
+
+        layout.add_widget(self.checkbox)
+        layout.add_widget(info)
+        layout.add_widget(btn_excel)
+        layout.add_widget(btn_pdf)
+        layout.add_widget(btn_csv)
+        layout.add_widget(btn_jsonl)
+        layout.add_widget(btn_delete)
+        self.add_widget(layout)
+
+    def refresh_view_attrs(self, rv, index, data):
+        """Reaproveita o card para outra linha de rv.data"""
+        self.rv = rv
+        self.owner = rv.owner
+        self.index = index
+        super().refresh_view_attrs(rv, index, data)
+        self.nome_label.text = f"📋 {self.nome}"
+        self.checkbox.active = self.selecionada
+        self.resumo_label.text = (
+            f"{self.num_comprados:.0f}/{self.num_itens:.0f} itens • "
+            f"R$ {self.total_comprado:.2f} de R$ {self.total_comprado + self.total_pendente:.2f}"
+        )
+        self.barra.value = 100 * self.num_comprados / self.num_itens if self.num_itens else 0
+
+    def _toggle_selecao(self, ativo: bool):
+        self.selecionada = ativo
+        self.owner.controller_callback('toggle_selecao', self.lista_id, ativo)
+
+    def on_release(self, *args):
+        """✅ Clique no CARD (não nos botões)"""
+        log.debug("🖱️ Clicou na lista: %s (ID: %s)", self.nome, self.lista_id)
+        self.owner.controller_callback('open_lista', self.lista_id)
+
+
 class HomeView(Screen):
     def __init__(self, controller_callback: Callable, **kwargs):
         super().__init__(**kwargs)
@@ -31,6 +127,9 @@ class HomeView(Screen):
         self.sm = None  # ✅ ADICIONEI ESTA LINHA
         self.controller_callback = controller_callback  # Referência ao Controller
         self.selecionadas = set()
+        self.stats = {}  # lista_id -> (itens, comprados, total comprado, total pendente)
+        self._carregando = 0  # consultas em andamento
+        self._posicoes = None  # cache lista_id -> índice em rv_listas.data
         
         # ✅ PERMISSÕES ANDROID (só executa no APK)
         if ANDROID_AVAILABLE and platform == "android":
@@ -38,7 +137,7 @@ class HomeView(Screen):
                 Permission.WRITE_EXTERNAL_STORAGE,
                 Permission.READ_EXTERNAL_STORAGE
             ])
-            print("✅ Permissões Android solicitadas (HomeView)")
+            log.info("✅ Permissões Android solicitadas (HomeView)")
         
         self._build_ui()
     
@@ -54,11 +153,14 @@ class HomeView(Screen):
         filtro_layout = MDBoxLayout(size_hint_y=None, height=60, spacing=10)
         self.input_filtro = MDTextField(
             hint_text="🔍 Filtrar listas...", 
-            on_text_validate=lambda x: self.controller_callback('filter_lists', self.input_filtro.text.strip())
+            on_text_validate=lambda x: self._apply_filter()
         )
+        # ✅ Busca enquanto digita: só dispara após DEBOUNCE_S sem teclas
+        self._filtro_trigger = Clock.create_trigger(lambda dt: self._apply_filter(), DEBOUNCE_S)
+        self.input_filtro.bind(text=lambda *args: self._schedule_filter())
         btn_limpar = MDIconButton(
             icon="close-circle", 
-            on_release=lambda x: self.controller_callback('filter_lists', "")
+            on_release=lambda x: self._clear_filter()
         )
         filtro_layout.add_widget(self.input_filtro)
         filtro_layout.add_widget(btn_limpar)
@@ -76,13 +178,49 @@ class HomeView(Screen):
             text="📊 Exportar", size_hint_x=0.25, disabled=True,
             on_release=lambda x: self.controller_callback('export_selected')
         )
+        self.btn_excluir = MDIconButton(
+            icon="delete-sweep", disabled=True,
+            on_release=lambda x: self.controller_callback('delete_selected')
+        )
         input_layout.add_widget(self.input_nova)
         input_layout.add_widget(btn_nova)
         input_layout.add_widget(self.btn_exportar)
+        input_layout.add_widget(self.btn_excluir)
         layout.add_widget(input_layout)
         
-        self.container_listas = MDBoxLayout(orientation='vertical', spacing=15, adaptive_height=True)
-        layout.add_widget(self.container_listas)
+        # Progresso de exportação (oculto quando não há jobs)
+        self._export_job_id = None
+        self.export_box = MDBoxLayout(size_hint_y=None, height=0, opacity=0, spacing=10)
+        self.lbl_export = MDLabel(size_hint_x=0.35)
+        self.barra_export = MDProgressBar(max=100, value=0, pos_hint={'center_y': 0.5})
+        btn_cancelar = MDIconButton(
+            icon="close-circle-outline",
+            on_release=lambda x: self._export_job_id and self.controller_callback('cancel_export', self._export_job_id)
+        )
+        self.export_box.add_widget(self.lbl_export)
+        self.export_box.add_widget(self.barra_export)
+        self.export_box.add_widget(btn_cancelar)
+        layout.add_widget(self.export_box)
+        
+        # Indicador de carregamento (consultas em background)
+        self.progresso = MDProgressBar(type="indeterminate", size_hint_y=None, height=4, opacity=0)
+        layout.add_widget(self.progresso)
+        
+        # Mensagem de lista vazia (fora do RecycleView)
+        self.lbl_vazio = MDLabel(halign="center", size_hint_y=None, height=0)
+        layout.add_widget(self.lbl_vazio)
+
+        # ✅ Lista virtualizada: só os cards visíveis existem
+        self.rv_listas = RecycleView(viewclass=ListaCard)
+        self.rv_listas.owner = self
+        container = RecycleBoxLayout(
+            orientation='vertical', spacing=15, size_hint_y=None,
+            default_size=(None, 90), default_size_hint=(1, None)
+        )
+        container.bind(minimum_height=container.setter('height'))
+        self.rv_listas.add_widget(container)
+        self.rv_listas.bind(scroll_y=self._on_scroll)
+        layout.add_widget(self.rv_listas)
         
         self.add_widget(layout)
     
@@ -94,80 +232,144 @@ class HomeView(Screen):
             self.controller_callback('create_lista', nome)
             self.input_nova.text = ""
     
+    def _schedule_filter(self):
+        """Reinicia a espera a cada tecla (debounce)"""
+        self._filtro_trigger.cancel()
+        self._filtro_trigger()
+    
+    def _apply_filter(self):
+        self._filtro_trigger.cancel()
+        self.controller_callback('filter_lists', self.input_filtro.text.strip())
+    
     def _clear_filter(self):
         """Limpa filtro"""
         self.input_filtro.text = ""
-        self.controller_callback('filter_lists', "")
+        self._apply_filter()
     
     def update_listas(self, listas_data: List, selecionadas: set):
         """Atualiza display das listas (chamado pelo Controller)"""
-        self.container_listas.clear_widgets()
         self.selecionadas = selecionadas
+        self._posicoes = None
+        self.rv_listas.data = [self._lista_data(lista_id, nome) for lista_id, nome in listas_data]
         
         if not listas_data:
             texto = "📝 Crie sua primeira lista!" if not self.input_filtro.text else "❌ Nenhuma encontrada"
-            self.container_listas.add_widget(MDLabel(text=texto, halign="center"))
-            self.btn_exportar.disabled = True
+            self._set_vazio(texto)
+            self._habilitar_selecao(False)
             return
         
-        for lista_id, nome in listas_data:
-            self._create_lista_card(lista_id, nome)
-        
-        self.btn_exportar.disabled = len(selecionadas) == 0
+        self._set_vazio("")
+        self._habilitar_selecao(len(selecionadas) > 0)
     
-    def _create_lista_card(self, lista_id: int, nome: str):
-        """Cria card individual da lista"""
-        card = MDCard(size_hint_y=None, height=90, radius=[12], padding=15, elevation=2)
-        layout = MDBoxLayout(orientation='horizontal', spacing=8, adaptive_height=True)
-        
-        # Checkbox
-        checkbox = MDCheckbox(active=lista_id in self.selecionadas, size_hint_x=None, width=48)
-        checkbox.bind(active=lambda x, lid=lista_id: self._toggle_selecao(lid, x.active))
-        
-        # Nome
-        nome_label = MDLabel(text=f"📋 {nome}", theme_text_color="Primary")
-        
-        # Espaço flexível
-        flex_space = MDLabel(size_hint_x=1)
-        
-        # Botões (chamam Controller)
-        btn_excel = MDIconButton(
-            icon="file-excel", icon_color=(0, 0.8, 0, 1), size_hint_x=None, width=48,
-            on_release=lambda x: self.controller_callback('export_excel', [lista_id])
-        )
-        btn_pdf = MDIconButton(
-            icon="file-pdf-box", icon_color=(0.8, 0, 0, 1), size_hint_x=None, width=48,
-            on_release=lambda x: self.controller_callback('export_pdf', [lista_id])
-        )
-        btn_delete = MDIconButton(
-            icon="trash-can-outline", icon_color=(1, 0, 0, 1), size_hint_x=None, width=48,
-            on_release=lambda x: self.controller_callback('confirm_delete_lista', lista_id)
-        )
-
-        # ✅ CORRIGIDO: Clique no CARD (não nos botões)
-        def on_card_release(instance):
-            print(f"🖱️ Clicou na lista: {nome} (ID: {lista_id})")  # DEBUG
-            self.controller_callback('open_lista', lista_id)
-        
-        # Monta card
-        layout.add_widget(checkbox)
-        layout.add_widget(nome_label)
-        layout.add_widget(flex_space)
-        layout.add_widget(btn_excel)
-        layout.add_widget(btn_pdf)
-        layout.add_widget(btn_delete)
-        card.add_widget(layout)
-        
-        card.bind(on_release=on_card_release)
-        self.container_listas.add_widget(card)
+    def append_listas(self, listas_data: List):
+        """Próxima página no fim (rolagem infinita)"""
+        if listas_data:
+            self.rv_listas.data.extend(self._lista_data(lista_id, nome) for lista_id, nome in listas_data)
+            self._posicoes = None
+    
+    def _on_scroll(self, rv, scroll_y):
+        """Menos de uma tela abaixo do que está visível: pede a próxima página"""
+        restante = scroll_y * max(0, rv.children[0].height - rv.height)
+        if rv.data and restante < rv.height:
+            self.controller_callback('load_more_listas')
+    
+    def set_loading(self, ativo: bool):
+        """Mostra a barra enquanto houver consulta em andamento"""
+        self._carregando = max(0, self._carregando + (1 if ativo else -1))
+        if self._carregando and not self.progresso.opacity:
+            self.progresso.opacity = 1
+            self.progresso.start()
+        elif not self._carregando and self.progresso.opacity:
+            self.progresso.stop()
+            self.progresso.opacity = 0
+    
+    def _set_vazio(self, texto: str):
+        """Mostra/oculta a mensagem de lista vazia"""
+        self.lbl_vazio.text = texto
+        self.lbl_vazio.height = 50 if texto else 0
+    
+    def on_pre_enter(self, *args):
+        """Voltando de uma lista: totais dos cards podem ter mudado"""
+        self.controller_callback('refresh_stats')
+    
+    def _lista_data(self, lista_id: int, nome: str) -> dict:
+        num_itens, num_comprados, comprado, pendente = self.stats.get(lista_id, (0, 0, 0.0, 0.0))
+        return {
+            'lista_id': lista_id, 'nome': nome, 'selecionada': lista_id in self.selecionadas,
+            'num_itens': num_itens, 'num_comprados': num_comprados,
+            'total_comprado': comprado, 'total_pendente': pendente,
+        }
+    
+    def _index_of(self, lista_id: int):
+        """Posição da lista em rv_listas.data (mapa refeito só após inserção/remoção)"""
+        if self._posicoes is None:
+            self._posicoes = {d['lista_id']: i for i, d in enumerate(self.rv_listas.data)}
+        return self._posicoes.get(lista_id)
+    
+    # ===== ATUALIZAÇÕES INCREMENTAIS (chamadas pelo Controller) =====
+    def insert_lista(self, lista_id: int, nome: str):
+        """Nova lista entra no topo (ordem id DESC) sem redesenhar as demais"""
+        self.rv_listas.data.insert(0, self._lista_data(lista_id, nome))
+        self._posicoes = None
+        self._set_vazio("")
+    
+    def remove_lista(self, lista_id: int):
+        """Remove apenas o card da lista excluída"""
+        index = self._index_of(lista_id)
+        if index is not None:
+            self.rv_listas.data.pop(index)
+            self._posicoes = None
+        if not self.rv_listas.data:
+            self._set_vazio("📝 Crie sua primeira lista!")
+        self._habilitar_selecao(len(self.selecionadas) > 0)
+    
+    def remove_listas(self, lista_ids: List[int]):
+        """Remove vários cards numa única atribuição (um só refresh do RecycleView)"""
+        removidas = set(lista_ids)
+        self.rv_listas.data = [d for d in self.rv_listas.data if d['lista_id'] not in removidas]
+        self._posicoes = None
+        if not self.rv_listas.data:
+            self._set_vazio("📝 Crie sua primeira lista!")
+        self._habilitar_selecao(len(self.selecionadas) > 0)
     
-    def _toggle_selecao(self, lista_id: int, ativo: bool):
-        """Gerencia seleção"""
-        if ativo:
-            self.selecionadas.add(lista_id)
-        else:
-            self.selecionadas.discard(lista_id)
-        self.btn_exportar.disabled = len(self.selecionadas) == 0
+    def update_stats(self):
+        """Reaplica self.stats só nos cards cujos números mudaram"""
+        data = self.rv_listas.data
+        for index, atual in enumerate(data):
+            novo = self._lista_data(atual['lista_id'], atual['nome'])
+            if novo != atual:
+                data[index] = novo
+    
+    def update_selecao(self, lista_id: int, ativo: bool):
+        """Seleção mudou: atualiza o card e os botões da seleção"""
+        index = self._index_of(lista_id)
+        if index is not None and self.rv_listas.data[index]['selecionada'] != ativo:
+            self.rv_listas.data[index] = self._lista_data(lista_id, self.rv_listas.data[index]['nome'])
+        self._habilitar_selecao(len(self.selecionadas) > 0)
+    
+    def _habilitar_selecao(self, ativo: bool):
+        """Botões que agem sobre a seleção (Exportar, Excluir selecionadas)"""
+        self.btn_exportar.disabled = not ativo
+        self.btn_excluir.disabled = not ativo
+    
+    def show_export_progress(self, job_id: int, fracao: float, pendentes: int):
+        """Mostra progresso do job atual (e quantos estão na fila)"""
+        self._export_job_id = job_id
+        self.export_box.height = 48
+        self.export_box.opacity = 1
+        fila = f" (+{pendentes - 1} na fila)" if pendentes > 1 else ""
+        self.lbl_export.text = f"📤 {fracao:.0%}{fila}"
+        self.barra_export.value = fracao * 100
+    
+    def hide_export_progress(self, pendentes: int):
+        """Esconde a barra quando a fila esvazia"""
+        if pendentes:
+            self.lbl_export.text = f"📤 ... ({pendentes} na fila)"
+            self.barra_export.value = 0
+            return
+        self._export_job_id = None
+        self.export_box.height = 0
+        self.export_box.opacity = 0
     
     def show_message(self, texto: str):
         """Exibe diálogo de mensagem"""
@@ -188,6 +390,14 @@ class HomeView(Screen):
             text=f"📄 PDF ({num_listas})",
             on_release=lambda x: self.controller_callback('export_pdf', list(self.selecionadas))
         ))
+        botoes.append(MDRaisedButton(
+            text=f"🧾 CSV ({num_listas})",
+            on_release=lambda x: self.controller_callback('export_formato', list(self.selecionadas), 'csv')
+        ))
+        botoes.append(MDRaisedButton(
+            text=f"🗜️ Backup .jsonl.gz ({num_listas})",
+            on_release=lambda x: self.controller_callback('export_formato', list(self.selecionadas), 'jsonl_gz')
+        ))
         
         self.export_dialog = MDDialog(
             title="Exportar Listas", text=f"Exportar {num_listas} lista(s)?", buttons=botoes
@@ -8,8 +8,71 @@ from kivymd.uix.textfield import MDTextField
 from kivymd.uix.toolbar import MDTopAppBar
 from kivymd.uix.dialog import MDDialog
 from kivymd.uix.selectioncontrol import MDCheckbox
+from kivymd.uix.progressbar import MDProgressBar
+from kivy.clock import Clock
 from kivy.uix.screenmanager import Screen
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.properties import BooleanProperty, NumericProperty, StringProperty
 from typing import Callable, List
+from models.rows import Item
+from utils.log import get_logger
+
+log = get_logger('lista_view')
+
+DEBOUNCE_S = 0.15  # pausa na digitação antes de filtrar
+
+
+class ItemRow(RecycleDataViewBehavior, MDBoxLayout):
+    """Linha de item reciclável: formata o texto só quando fica visível"""
+    item_id = NumericProperty(0)
+    nome = StringProperty("")
+    qtd = NumericProperty(0)
+    preco = NumericProperty(0)
+    subtotal = NumericProperty(0)
+    comprado = BooleanProperty(False)
+
+    def __init__(self, **kwargs):
+        super().__init__(spacing=10, **kwargs)
+        self.owner = None
+        self.rv = None
+        self.index = None
+
+        # Checkbox
+        self.chk = MDCheckbox()
+        self.chk.bind(on_release=lambda x: self.owner.controller_callback('toggle_item', self.item_id, x.active))
+
+        # Info do item
+        info_layout = MDBoxLayout(orientation='vertical', size_hint_x=0.75)
+        self.lbl_info = MDLabel(valign='middle')
+        info_layout.add_widget(self.lbl_info)
+
+        # Delete
+        btn_delete = MDIconButton(
+            icon="trash-can-outline", 
+            icon_color=(1, 0, 0, 1),
+            on_release=lambda x: self.owner.controller_callback('confirm_delete_item', self.item_id)
+        )
+
+        self.add_widget(self.chk)
+        self.add_widget(info_layout)
+        self.add_widget(btn_delete)
+
+    def refresh_view_attrs(self, rv, index, data):
+        """Reaproveita a linha para outro item de rv.data"""
+        self.rv = rv
+        self.owner = rv.owner
+        self.index = index
+        super().refresh_view_attrs(rv, index, data)
+        self.chk.active = self.comprado
+
+        texto = f"{self.nome} | {self.qtd:.1f} x R${self.preco:.2f}"
+        if self.comprado:
+            texto += f" = R${self.subtotal:.2f}"
+        else:
+            texto += " (pendente)"
+        self.lbl_info.text = texto
 
 
 class ListaView(Screen):
@@ -19,6 +82,9 @@ class ListaView(Screen):
         self.sm = None  # ✅ ADICIONEI ESTA LINHA
         self.controller_callback = controller_callback
         self.lista_id = None
+        self.total = 0.0  # total comprado exibido
+        self._carregando = 0  # consultas em andamento
+        self._posicoes = None  # cache item_id -> índice em rv_itens.data
         self._build_ui()
     
     def _build_ui(self):
@@ -37,6 +103,9 @@ class ListaView(Screen):
         self.input_filtro_item = MDTextField(
             hint_text="🔍 Filtrar itens...", on_text_validate=lambda x: self._apply_filter()
         )
+        # ✅ Busca enquanto digita: só dispara após DEBOUNCE_S sem teclas
+        self._filtro_trigger = Clock.create_trigger(lambda dt: self._apply_filter(), DEBOUNCE_S)
+        self.input_filtro_item.bind(text=lambda *args: self._schedule_filter())
         btn_limpar = MDIconButton(icon="close-circle", on_release=lambda x: self._clear_filter())
         filtro_layout.add_widget(self.input_filtro_item)
         filtro_layout.add_widget(btn_limpar)
@@ -52,13 +121,43 @@ class ListaView(Screen):
         input_layout.add_widget(self.input_preco)
         layout.add_widget(input_layout)
         
+        # ✅ Autocomplete: nomes já usados, preenchem qtd/preço do último uso
+        self.sugestoes_layout = MDBoxLayout(size_hint_y=None, height=0, spacing=5)
+        layout.add_widget(self.sugestoes_layout)
+        self._preenchendo = False  # texto vindo de uma sugestão não pede outras
+        self._sugestao_trigger = Clock.create_trigger(lambda dt: self._pedir_sugestoes(), DEBOUNCE_S)
+        self.input_nome.bind(text=lambda *args: self._schedule_sugestoes())
+        
+        botoes_layout = MDBoxLayout(size_hint_y=None, height=50, spacing=10)
         btn_add = MDRaisedButton(
             text="➕ Adicionar", height=50, on_release=lambda x: self._add_item()
         )
-        layout.add_widget(btn_add)
+        btn_importar = MDFlatButton(
+            text="📥 Importar", height=50, on_release=lambda x: self.show_import_dialog()
+        )
+        botoes_layout.add_widget(btn_add)
+        botoes_layout.add_widget(btn_importar)
+        layout.add_widget(botoes_layout)
         
-        self.container_itens = MDBoxLayout(orientation='vertical', spacing=10, adaptive_height=True)
-        layout.add_widget(self.container_itens)
+        # Indicador de carregamento (consultas em background)
+        self.progresso = MDProgressBar(type="indeterminate", size_hint_y=None, height=4, opacity=0)
+        layout.add_widget(self.progresso)
+        
+        # Mensagem de lista vazia (fora do RecycleView)
+        self.lbl_vazio = MDLabel(halign="center", size_hint_y=None, height=0)
+        layout.add_widget(self.lbl_vazio)
+
+        # ✅ Lista virtualizada: só as linhas visíveis existem
+        self.rv_itens = RecycleView(viewclass=ItemRow)
+        self.rv_itens.owner = self
+        container = RecycleBoxLayout(
+            orientation='vertical', spacing=10, size_hint_y=None,
+            default_size=(None, 55), default_size_hint=(1, None)
+        )
+        container.bind(minimum_height=container.setter('height'))
+        self.rv_itens.add_widget(container)
+        self.rv_itens.bind(scroll_y=self._on_scroll)
+        layout.add_widget(self.rv_itens)
         
         self.add_widget(layout)
     
@@ -66,6 +165,7 @@ class ListaView(Screen):
         """Carrega lista específica"""
         self.lista_id = lista_id
         self.input_filtro_item.text = ""
+        self._filtro_trigger.cancel()  # load_itens já carrega sem filtro
         self.controller_callback('load_itens', lista_id)
     
     def _add_item(self):
@@ -74,76 +174,190 @@ class ListaView(Screen):
         try:
             qtd = float(self.input_qtd.text or 0)
             preco = float(self.input_preco.text or 0)
-            print(f"➕ Tentando adicionar: {nome}, {qtd}, R${preco}")  # DEBUG
+            log.debug("➕ Tentando adicionar: %s, %s, R$%s", nome, qtd, preco)
 
             if nome and qtd > 0 and preco > 0 and self.lista_id:
                 self.controller_callback('add_item', self.lista_id, nome, qtd, preco)
                 # Limpa campos
                 self.input_nome.text = self.input_qtd.text = self.input_preco.text = ""
             else:
-                print("❌ Validação falhou")
+                log.warning("❌ Validação falhou")
         except ValueError as e:
-            print(f"❌ Erro nos dados: {e}")
+            log.warning("❌ Erro nos dados: %s", e)
+    
+    def _schedule_sugestoes(self):
+        self._sugestao_trigger.cancel()
+        if self._preenchendo or not self.input_nome.text.strip():
+            self.show_sugestoes([])
+        else:
+            self._sugestao_trigger()
+    
+    def _pedir_sugestoes(self):
+        if self.input_nome.focus:
+            self.controller_callback('suggest_itens', self.input_nome.text)
+    
+    def show_sugestoes(self, sugestoes: List):
+        """Um botão por Sugestao (controllers/autocomplete.py) abaixo dos campos"""
+        self.sugestoes_layout.clear_widgets()
+        for sugestao in sugestoes:
+            self.sugestoes_layout.add_widget(MDFlatButton(
+                text=f"{sugestao.nome} ({sugestao.quantidade:g} x R${sugestao.preco_unit:.2f})",
+                on_release=lambda x, s=sugestao: self._usar_sugestao(s)
+            ))
+        self.sugestoes_layout.height = 40 if sugestoes else 0
+    
+    def _usar_sugestao(self, sugestao):
+        """Preenche nome, qtd e preço; o usuário só confirma ou ajusta"""
+        self._preenchendo = True
+        self.input_nome.text = sugestao.nome
+        self.input_qtd.text = f"{sugestao.quantidade:g}"
+        self.input_preco.text = f"{sugestao.preco_unit:.2f}"
+        self._preenchendo = False
+        self.show_sugestoes([])
+    
+    def _schedule_filter(self):
+        """Reinicia a espera a cada tecla (debounce)"""
+        self._filtro_trigger.cancel()
+        self._filtro_trigger()
     
     def _apply_filter(self):
         """Aplica filtro de itens"""
+        self._filtro_trigger.cancel()
         if self.lista_id:
             self.controller_callback('filter_itens', self.lista_id, self.input_filtro_item.text)
     
     def _clear_filter(self):
         self.input_filtro_item.text = ""
-        if self.lista_id:
-            self.controller_callback('filter_itens', self.lista_id, "")
+        self._apply_filter()
     
     def update_itens(self, itens_data: List, total: float):
         """✅ CORRIGIDO - Atualiza lista de itens na tela"""
-        print(f"🔄 Atualizando {len(itens_data)} itens, total R$ {total:.2f}")  # DEBUG
-        self.container_itens.clear_widgets()
+        log.debug("🔄 Atualizando %d itens, total R$ %.2f", len(itens_data), total)
+        self._posicoes = None
+        self.rv_itens.data = [self._item_data(item) for item in itens_data]
+        self.total = total
 
         if not itens_data:
-            empty_label = MDLabel(
-                text="📝 Adicione o primeiro item!", 
-                halign="center", size_hint_y=None, height=50
-            )
-            self.container_itens.add_widget(empty_label)
+            self._set_vazio("📝 Adicione o primeiro item!")
             self.lbl_total.text = "Total comprados: R$ 0,00"
             return
 
-        for item_id, nome, qtd, preco, comprado in itens_data:
-            self._create_item_row(item_id, nome, qtd, preco, comprado)
-
+        self._set_vazio("")
+        self.lbl_total.text = f"Total comprados: R$ {total:.2f}"
+    
+    def append_itens(self, itens_data: List):
+        """Próxima página no fim (rolagem infinita)"""
+        if itens_data:
+            self.rv_itens.data.extend(self._item_data(item) for item in itens_data)
+            self._posicoes = None
+    
+    def _on_scroll(self, rv, scroll_y):
+        """Menos de uma tela abaixo do que está visível: pede a próxima página"""
+        restante = scroll_y * max(0, rv.children[0].height - rv.height)
+        if rv.data and self.lista_id and restante < rv.height:
+            self.controller_callback('load_more_itens', self.lista_id)
+    
+    def set_loading(self, ativo: bool):
+        """Mostra a barra enquanto houver consulta em andamento"""
+        self._carregando = max(0, self._carregando + (1 if ativo else -1))
+        if self._carregando and not self.progresso.opacity:
+            self.progresso.opacity = 1
+            self.progresso.start()
+        elif not self._carregando and self.progresso.opacity:
+            self.progresso.stop()
+            self.progresso.opacity = 0
+    
+    def _set_vazio(self, texto: str):
+        """Mostra/oculta a mensagem de lista vazia"""
+        self.lbl_vazio.text = texto
+        self.lbl_vazio.height = 50 if texto else 0
+    
+    @staticmethod
+    def _item_data(item: Item) -> dict:
+        return {'item_id': item.id, 'nome': item.nome, 'qtd': item.quantidade, 'preco': item.preco_unit,
+                'subtotal': item.subtotal, 'comprado': bool(item.comprado)}
+    
+    def _index_of(self, item_id: int):
+        """Posição do item em rv_itens.data (mapa refeito só após inserção/remoção)"""
+        if self._posicoes is None:
+            self._posicoes = {d['item_id']: i for i, d in enumerate(self.rv_itens.data)}
+        return self._posicoes.get(item_id)
+    
+    # ===== ATUALIZAÇÕES INCREMENTAIS (chamadas pelo Controller) =====
+    def insert_item(self, item: Item):
+        """Novo item entra no fim (ordem por id)"""
+        self._posicoes = None
+        self.rv_itens.data.append(self._item_data(item))
+        self._set_vazio("")
+    
+    def update_item(self, item: Item):
+        """Atualiza só a linha do item alterado"""
+        index = self._index_of(item.id)
+        if index is not None:
+            self.rv_itens.data[index] = self._item_data(item)
+    
+    def remove_item(self, item_id: int):
+        """Remove só a linha do item excluído"""
+        index = self._index_of(item_id)
+        if index is not None:
+            self.rv_itens.data.pop(index)
+            self._posicoes = None
+        if not self.rv_itens.data:
+            self._set_vazio("📝 Adicione o primeiro item!")
+    
+    def item_data(self, item_id: int):
+        """Dados da linha do item (None se não estiver carregado)"""
+        index = self._index_of(item_id)
+        return self.rv_itens.data[index] if index is not None else None
+    
+    def update_total(self, total: float):
+        self.total = total
         self.lbl_total.text = f"Total comprados: R$ {total:.2f}"
+    
+    def show_import_dialog(self):
+        """Importação em lote: texto colado (uma linha por item) ou arquivo CSV"""
+        if not self.lista_id:
+            return
+        conteudo = MDBoxLayout(orientation='vertical', size_hint_y=None, height=220)
+        campo = MDTextField(
+            hint_text="nome;qtd;preço (uma linha por item)", multiline=True,
+            size_hint_y=None, height=200
+        )
+        conteudo.add_widget(campo)
         
-    def _create_item_row(self, item_id: int, nome: str, qtd: float, preco: float, comprado: int):
-        """✅ CORRIGIDO - Linha de item funcional"""
-        linha = MDBoxLayout(size_hint_y=None, height=55, spacing=10)
-
-        # Checkbox
-        chk = MDCheckbox(active=bool(comprado))
-        chk.bind(on_release=lambda x: self.controller_callback('toggle_item', item_id, x.active))
-
-        # Info do item
-        subtotal = qtd * preco if comprado else 0
-        texto = f"{nome} | {qtd:.1f} x R${preco:.2f}"
-        if comprado:
-            texto += f" = R${subtotal:.2f}"
-        else:
-            texto += " (pendente)"
-
-        info_layout = MDBoxLayout(orientation='vertical', size_hint_x=0.75)
-        info_layout.add_widget(MDLabel(text=texto, valign='middle'))
-
-        # Delete
-        btn_delete = MDIconButton(
-            icon="trash-can-outline", 
-            icon_color=(1, 0, 0, 1),
-            on_release=lambda x: self.controller_callback('confirm_delete_item', item_id)
+        def importar_texto(x):
+            if campo.text.strip():
+                self.controller_callback('import_texto', self.lista_id, campo.text)
+            dialog.dismiss()
+        
+        def importar_arquivo(x):
+            dialog.dismiss()
+            self.controller_callback('import_arquivo', self.lista_id)
+        
+        dialog = MDDialog(
+            title="Importar Itens", type="custom", content_cls=conteudo,
+            buttons=[
+                MDFlatButton(text="CANCELAR", on_release=lambda x: dialog.dismiss()),
+                MDFlatButton(text="ARQUIVO CSV", on_release=importar_arquivo),
+                MDRaisedButton(text="IMPORTAR", on_release=importar_texto)
+            ]
         )
-
-        linha.add_widget(chk)
-        linha.add_widget(info_layout)
-        linha.add_widget(btn_delete)
-        self.container_itens.add_widget(linha)
+        dialog.open()
+    
+    def show_import_result(self, importados: int, erros: List):
+        """Resumo da importação com as primeiras linhas rejeitadas"""
+        texto = f"✅ {importados} item(ns) importado(s)"
+        if erros:
+            texto += f"\n❌ {len(erros)} linha(s) rejeitada(s):"
+            for erro in erros[:10]:
+                texto += f"\n  linha {erro.linha}: {erro.erro}"
+            if len(erros) > 10:
+                texto += f"\n  ... e mais {len(erros) - 10}"
+        dialog = MDDialog(
+            title="Importação", text=texto,
+            buttons=[MDFlatButton(text="OK", on_release=lambda x: dialog.dismiss())]
+        )
+        dialog.open()
     
     def show_confirm_dialog(self, title: str, text: str, on_confirm: Callable):
         dialog = MDDialog(